@@ -9,10 +9,86 @@ constraints and optimizing for production without cellular maintenance costs.
 import cobra
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from cobra.core import Reaction, Metabolite
-from fba_optimizer import WorkingFBAOptimizer
+from cobra.util.array import create_stoichiometric_matrix
+from cobra.util.context import get_context
+from scipy.optimize import linprog
+from fba_optimizer import (WorkingFBAOptimizer, BIOMASS_ID, finish_figure, get_pyplot,
+                           load_or_build, reaction_flux, select_solver)
+
+# Minimal salts/minerals medium shared by all substrates (uptake bounds, mmol/gDW/h)
+_BASE_MEDIUM = {
+    'EX_o2_e': 20.0,  # Aerobic conditions
+    'EX_pi_e': 1000.0,
+    'EX_nh4_e': 1000.0,
+    'EX_so4_e': 1000.0,
+    'EX_mg2_e': 1000.0,
+    'EX_k_e': 1000.0,
+    'EX_fe2_e': 1000.0,
+    'EX_ca2_e': 1000.0,
+    'EX_mn2_e': 1000.0,
+    'EX_zn2_e': 1000.0,
+    'EX_cu2_e': 1000.0,
+    'EX_cobalt2_e': 1000.0,
+    'EX_mobd_e': 1000.0
+}
+
+# Exchange reaction for each supported primary substrate
+_SUBSTRATE_EX = {
+    'glucose': 'EX_glc__D_e',
+    'formate': 'EX_for_e',
+    'acetate': 'EX_ac_e'
+}
+
+# Biomass and maintenance reactions of iML1515, removed in the cell-free model
+_KNOWN_BIOMASS = frozenset({BIOMASS_ID, 'BIOMASS_Ec_iML1515_WT_75p37M'})
+_KNOWN_MAINTENANCE = frozenset({'ATPM'})
+
+# Molecular weights of the free fatty acids (g/mol)
+_FATTY_ACID_MW = {
+    'butanoic_acid': 88.11,
+    'hexanoic_acid': 116.16,
+    'octanoic_acid': 144.21,
+    'decanoic_acid': 172.26,
+    'dodecanoic_acid': 200.32,
+    'tetradecanoic_acid': 228.37
+}
+
+# Column layout of the test_substrate_preferences results
+_SUBSTRATE_RESULT_DTYPE = np.dtype([
+    ('Substrate', 'U16'),
+    ('Uptake Rate', np.float64),
+    ('Production Rate (mmol/gDW/h)', np.float64),
+    ('Yield (mol/mol substrate)', np.float64),
+    ('Productivity (g/L/h)', np.float64),
+    ('Status', object)
+])
+
+# scipy.optimize.linprog status codes
+_LINPROG_STATUS = {0: 'optimal', 1: 'iteration_limit', 2: 'infeasible', 3: 'unbounded'}
+
+def _set_production_conditions(model: cobra.Model, demand: Union[str, Reaction],
+                               substrate: str, substrate_uptake: float):
+    """Apply the substrate medium and the fatty acid demand objective."""
+    model.medium = {**_BASE_MEDIUM, _SUBSTRATE_EX[substrate]: substrate_uptake}
+    model.objective = demand
+
+def _postprocess(production: np.ndarray, uptake: np.ndarray,
+                 mw: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized yield and productivity for a batch of production solves.
+    
+    Args:
+        production: Production rates (mmol/gDW/h)
+        uptake: Actual substrate uptake rates (mmol/gDW/h)
+        mw: Product molecular weight (g/mol)
+        
+    Returns:
+        (yield in mol/mol substrate, productivity in g/L/h at 1 gDW/L)
+    """
+    yields = np.divide(production, uptake, out=np.zeros_like(production), where=uptake > 0)
+    return yields, production * mw / 1000
 
 class CellFreeSimulator:
     """
@@ -21,7 +97,9 @@ class CellFreeSimulator:
     
     def __init__(self, model_name: str = "iML1515"):
         """Initialize the cell-free simulator."""
-        self.cellular_model = cobra.io.load_model(model_name)
+        self.model_name = model_name
+        self.solver = select_solver()
+        self._cellular_model = None
         self.cell_free_model = None
         self.fatty_acid_map = {
             'butanoic_acid': 'btcoa_c',
@@ -33,22 +111,203 @@ class CellFreeSimulator:
         }
         self.demand_reactions = {}
         
-        print(f"Initialized cell-free simulator with {model_name}")
-        
-    def create_cell_free_model(self):
+        print(f"Initialized cell-free simulator with {model_name} ({self.solver} solver)")
+    
+    @property
+    def cellular_model(self) -> cobra.Model:
+        """The cellular model, loaded on first use; a cached cell-free model never needs it."""
+        if self._cellular_model is None:
+            self._cellular_model = cobra.io.load_model(self.model_name)
+            self._cellular_model.solver = self.solver
+        return self._cellular_model
+        
+    def create_cell_free_model(self, use_cache: bool = True):
         """
         Create a cell-free model by removing growth constraints and 
         cellular maintenance reactions.
+        
+        Args:
+            use_cache: Reuse (and store) the built model in the on-disk cache
         """
         print("Creating cell-free model...")
         
+        key = f"{self.model_name}:{self.solver}:{sorted(self.fatty_acid_map.items())!r}"
+        self.cell_free_model = load_or_build('cell_free', key, self._build_cell_free_model,
+                                             sources=(__file__,), use_cache=use_cache)
+        
+        # Register the demand reactions (a cached model already contains them)
+        self._add_demand_reactions()
+        
+        self._prepare_lp()
+        
+        print("Cell-free model created successfully!")
+        
+    def _prepare_lp(self):
+        """Resolve handles and rebuild the LP arrays, solvers and memo from cell_free_model."""
+        self._resolve_handles()
+        self._build_lp_arrays()
+        self._build_specialized_solvers()
+        self._solve_cache = {}
+        self._lp_shape = self._model_shape()
+        
+    def _model_shape(self) -> Tuple[int, int]:
+        """Reaction and metabolite counts of cell_free_model (cheap staleness check)."""
+        return len(self.cell_free_model.reactions), len(self.cell_free_model.metabolites)
+        
+    def invalidate_lp(self):
+        """
+        Mark the HiGHS LP snapshot as stale after editing cell_free_model.
+        
+        The default optimize_cell_free_production path solves arrays taken
+        from the model and memoizes the results. Call this after changing
+        bounds or stoichiometry of cell_free_model (e.g. a knockout); the
+        next solve rebuilds the arrays and clears the memo. Called inside a
+        model context, it also invalidates again when the context reverts
+        the edits on exit. Only added or removed reactions and metabolites
+        are detected without it.
+        """
+        self._lp_shape = None
+        
+        context = get_context(self.cell_free_model)
+        if context:
+            context(self.invalidate_lp)
+        
+    def _resolve_handles(self):
+        """Resolve fatty acid, demand and substrate exchange objects once by name."""
+        metabolites = self.cell_free_model.metabolites
+        reactions = self.cell_free_model.reactions
+        
+        self._fa_met_objs = {name: metabolites.get_by_id(met_id)
+                             for name, met_id in self.fatty_acid_map.items()
+                             if met_id in metabolites}
+        self._fa_demand_objs = {name: reactions.get_by_id(demand_id)
+                                for name, demand_id in self.demand_reactions.items()}
+        self._substrate_ex_objs = {substrate: reactions.get_by_id(ex_id)
+                                   for substrate, ex_id in _SUBSTRATE_EX.items()
+                                   if ex_id in reactions}
+        
+    def _build_lp_arrays(self):
+        """
+        Snapshot the cell-free LP as arrays (S v = 0, lb <= v <= ub, max c v)
+        so bulk analyses can edit bounds with NumPy slices and call HiGHS
+        directly instead of going through optlang.
+        """
+        reactions = self.cell_free_model.reactions
+        n_reactions = len(reactions)
+        
+        self._S = create_stoichiometric_matrix(self.cell_free_model, array_type='lil').tocsc()
+        self._rxn_index = {rxn.id: i for i, rxn in enumerate(reactions)}
+        
+        # Bounds are taken under the base medium (no carbon source), so a
+        # production solve only has to open one substrate exchange column
+        with self.cell_free_model as model:
+            model.medium = _BASE_MEDIUM
+            self._lb = np.fromiter((rxn.lower_bound for rxn in reactions), float, n_reactions)
+            self._ub = np.fromiter((rxn.upper_bound for rxn in reactions), float, n_reactions)
+        self._c = np.fromiter((rxn.objective_coefficient for rxn in reactions), float, n_reactions)
+        
+    def _build_specialized_solvers(self):
+        """
+        Build one solve(uptake) closure per (fatty acid, substrate) pair with
+        the column indices, objective vector and packed bounds resolved up
+        front, so a solve is a bound copy plus one HiGHS call.
+        """
+        atpm_col = self._rxn_index.get('ATPM')
+        A_eq = self._S
+        b_eq = np.zeros(A_eq.shape[0])
+        base_bounds = np.column_stack((self._lb, self._ub))
+        self._solvers = {}
+        
+        def make_solver(demand_col: int, substrate_col: Optional[int]):
+            neg_c = np.zeros_like(self._c)
+            neg_c[demand_col] = -1.0
+            
+            def solve(substrate_uptake: float) -> Tuple[float, float, float, str]:
+                bounds = base_bounds.copy()
+                if substrate_col is not None:
+                    bounds[substrate_col, 0] = -substrate_uptake
+                
+                result = linprog(neg_c, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method='highs-ds')
+                status = _LINPROG_STATUS.get(result.status, 'failed')
+                if status != 'optimal':
+                    return 0.0, 0.0, 0.0, status
+                
+                x = result.x
+                return (abs(result.fun),
+                        abs(x[substrate_col]) if substrate_col is not None else 0.0,
+                        abs(x[atpm_col]) if atpm_col is not None else 0.0,
+                        status)
+            
+            return solve
+        
+        for name, demand_id in self.demand_reactions.items():
+            for substrate, ex_id in _SUBSTRATE_EX.items():
+                self._solvers[(name, substrate)] = make_solver(self._rxn_index[demand_id],
+                                                               self._rxn_index.get(ex_id))
+        
+    def _solve(self, fatty_acid_name: str, substrate: str,
+               substrate_uptake: float) -> Tuple[float, float, float, str]:
+        """
+        Cell-free production solve straight on the LP arrays, memoized.
+        
+        Only the substrate exchange bound and the demand objective column
+        change between calls, so this skips optlang's model/solver sync and
+        dispatches to the prebuilt closure for the pair. The LP is
+        deterministic, so results are cached per (fatty_acid, substrate,
+        uptake). The arrays and cache are rebuilt after invalidate_lp() or
+        when reactions or metabolites were added or removed; other edits to
+        cell_free_model are not seen until invalidate_lp() is called.
+        
+        Returns:
+            (production_rate, substrate_uptake_actual, atp_consumption, status)
+        """
+        if self._lp_shape != self._model_shape():
+            self._prepare_lp()
+        
+        key = (fatty_acid_name, substrate, substrate_uptake)
+        cached = self._solve_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        solved = self._solvers[(fatty_acid_name, substrate)](substrate_uptake)
+        self._solve_cache[key] = solved
+        return solved
+        
+    def _solve_production_highs(self, fatty_acid_name: str, substrate: str,
+                                substrate_uptake: float) -> Dict:
+        """Results dictionary for a (memoized) HiGHS production solve."""
+        production_rate, uptake_actual, atp_consumption, status = self._solve(
+            fatty_acid_name, substrate, substrate_uptake)
+        return self._summarize_solution(fatty_acid_name, substrate, substrate_uptake,
+                                        production_rate, status, uptake_actual,
+                                        atp_consumption)
+        
+    def _build_cell_free_model(self) -> cobra.Model:
+        """Derive the cell-free model from the cellular model."""
         # Start with cellular model
         self.cell_free_model = self.cellular_model.copy()
         
-        # Remove or constrain biomass reactions
-        biomass_reactions = [rxn for rxn in self.cell_free_model.reactions 
-                           if 'BIOMASS' in rxn.id or 'biomass' in rxn.name.lower()]
+        # Look up the known biomass and maintenance reactions by id
+        reactions = self.cell_free_model.reactions
+        biomass_reactions = [reactions.get_by_id(rxn_id) for rxn_id in sorted(_KNOWN_BIOMASS)
+                             if rxn_id in reactions]
+        maintenance_reactions = [reactions.get_by_id(rxn_id) for rxn_id in sorted(_KNOWN_MAINTENANCE)
+                                 if rxn_id in reactions]
+        
+        # Other models: fall back to a single substring scan over all reactions
+        if not biomass_reactions or not maintenance_reactions:
+            scanned_biomass, scanned_maintenance = [], []
+            for rxn in reactions:
+                rxn_id = rxn.id
+                name_lower = rxn.name.lower() if rxn.name else ''
+                if 'BIOMASS' in rxn_id or 'biomass' in name_lower:
+                    scanned_biomass.append(rxn)
+                if 'ATPM' in rxn_id or 'maintenance' in name_lower:
+                    scanned_maintenance.append(rxn)
+            biomass_reactions = biomass_reactions or scanned_biomass
+            maintenance_reactions = maintenance_reactions or scanned_maintenance
         
+        # Remove or constrain biomass reactions
         print(f"Found {len(biomass_reactions)} biomass reactions:")
         for rxn in biomass_reactions:
             print(f"  {rxn.id}: {rxn.name}")
@@ -57,9 +316,6 @@ class CellFreeSimulator:
             rxn.upper_bound = 0
             
         # Remove ATP maintenance (cell-free systems don't need cellular maintenance)
-        maintenance_reactions = [rxn for rxn in self.cell_free_model.reactions 
-                               if 'ATPM' in rxn.id or 'maintenance' in rxn.name.lower()]
-        
         print(f"Found {len(maintenance_reactions)} maintenance reactions:")
         for rxn in maintenance_reactions:
             print(f"  {rxn.id}: {rxn.name}")
@@ -69,11 +325,13 @@ class CellFreeSimulator:
             
         # Add demand reactions for fatty acids
         self._add_demand_reactions()
-        
-        print("Cell-free model created successfully!")
+        return self.cell_free_model
         
     def _add_demand_reactions(self):
         """Add demand reactions for fatty acid CoA metabolites."""
+        # Collect new reactions and add them in one call (one solver update)
+        new_reactions = []
+        
         for name, met_id in self.fatty_acid_map.items():
             try:
                 met = self.cell_free_model.metabolites.get_by_id(met_id)
@@ -85,18 +343,23 @@ class CellFreeSimulator:
                     demand_rxn.lower_bound = 0
                     demand_rxn.upper_bound = 1000
                     demand_rxn.add_metabolites({met: -1})
-                    self.cell_free_model.add_reactions([demand_rxn])
+                    new_reactions.append(demand_rxn)
                     
-                    self.demand_reactions[name] = demand_id
                     print(f"  Added cell-free demand for {name}: {demand_id}")
                     
+                self.demand_reactions[name] = demand_id
+                    
             except KeyError:
                 print(f"  Warning: {met_id} not found for {name}")
+        
+        if new_reactions:
+            self.cell_free_model.add_reactions(new_reactions)
     
     def optimize_cell_free_production(self, 
                                     fatty_acid_name: str,
                                     substrate: str = "glucose",
-                                    substrate_uptake: float = 10.0) -> Dict:
+                                    substrate_uptake: float = 10.0,
+                                    include_solution: bool = False) -> Dict:
         """
         Optimize fatty acid production in cell-free system.
         
@@ -104,6 +367,10 @@ class CellFreeSimulator:
             fatty_acid_name: Name of fatty acid to optimize
             substrate: Primary substrate ("glucose", "formate", "acetate")
             substrate_uptake: Substrate uptake rate (mmol/gDW/h)
+            include_solution: Also return the cobra Solution and model under
+                'solution'/'model' (slower; by default only the scalar results
+                are returned, solved directly with HiGHS on a snapshot of the
+                model; call invalidate_lp() after editing cell_free_model)
             
         Returns:
             optimization_results: Dictionary with results
@@ -114,83 +381,53 @@ class CellFreeSimulator:
         if fatty_acid_name not in self.fatty_acid_map:
             raise ValueError(f"Fatty acid '{fatty_acid_name}' not supported")
             
-        # Create optimization model
-        opt_model = self.cell_free_model.copy()
-        
-        # Set substrate medium
-        if substrate == "glucose":
-            opt_model.medium = {
-                'EX_glc__D_e': substrate_uptake,
-                'EX_o2_e': 20.0,  # Aerobic conditions
-                'EX_pi_e': 1000.0,
-                'EX_nh4_e': 1000.0,
-                'EX_so4_e': 1000.0,
-                'EX_mg2_e': 1000.0,
-                'EX_k_e': 1000.0,
-                'EX_fe2_e': 1000.0,
-                'EX_ca2_e': 1000.0,
-                'EX_mn2_e': 1000.0,
-                'EX_zn2_e': 1000.0,
-                'EX_cu2_e': 1000.0,
-                'EX_cobalt2_e': 1000.0,
-                'EX_mobd_e': 1000.0
-            }
-        elif substrate == "formate":
-            opt_model.medium = {
-                'EX_for_e': substrate_uptake,
-                'EX_o2_e': 20.0,
-                'EX_pi_e': 1000.0,
-                'EX_nh4_e': 1000.0,
-                'EX_so4_e': 1000.0,
-                'EX_mg2_e': 1000.0,
-                'EX_k_e': 1000.0,
-                'EX_fe2_e': 1000.0,
-                'EX_ca2_e': 1000.0,
-                'EX_mn2_e': 1000.0,
-                'EX_zn2_e': 1000.0,
-                'EX_cu2_e': 1000.0,
-                'EX_cobalt2_e': 1000.0,
-                'EX_mobd_e': 1000.0
-            }
-        elif substrate == "acetate":
-            opt_model.medium = {
-                'EX_ac_e': substrate_uptake,
-                'EX_o2_e': 20.0,
-                'EX_pi_e': 1000.0,
-                'EX_nh4_e': 1000.0,
-                'EX_so4_e': 1000.0,
-                'EX_mg2_e': 1000.0,
-                'EX_k_e': 1000.0,
-                'EX_fe2_e': 1000.0,
-                'EX_ca2_e': 1000.0,
-                'EX_mn2_e': 1000.0,
-                'EX_zn2_e': 1000.0,
-                'EX_cu2_e': 1000.0,
-                'EX_cobalt2_e': 1000.0,
-                'EX_mobd_e': 1000.0
-            }
-        
-        # Set objective
-        demand_id = self.demand_reactions[fatty_acid_name]
-        opt_model.objective = demand_id
-        
-        # Optimize
-        solution = opt_model.optimize()
-        
-        if solution.status == 'optimal':
+        if substrate not in _SUBSTRATE_EX:
+            raise ValueError(f"Substrate '{substrate}' not supported. "
+                           f"Available: {list(_SUBSTRATE_EX.keys())}")
+            
+        if not include_solution:
+            return self._solve_production_highs(fatty_acid_name, substrate, substrate_uptake)
+            
+        # Scope medium/objective changes to this call; cobra reverts them on exit
+        with self.cell_free_model as opt_model:
+            _set_production_conditions(opt_model, self._fa_demand_objs[fatty_acid_name],
+                                       substrate, substrate_uptake)
+            solution = opt_model.optimize()
+            if solution.status != 'optimal':
+                return self._summarize_solution(fatty_acid_name, substrate, substrate_uptake,
+                                                0.0, solution.status)
+            
+            # Read fluxes while the solver still holds this solution
+            uptake_actual = (abs(self._substrate_ex_objs[substrate].flux)
+                             if substrate in self._substrate_ex_objs else 0.0)
+            return self._summarize_solution(fatty_acid_name, substrate, substrate_uptake,
+                                            solution.objective_value, solution.status,
+                                            uptake_actual, abs(reaction_flux(opt_model, 'ATPM')),
+                                            solution, opt_model)
+    
+    def _summarize_solution(self, fatty_acid_name: str, substrate: str,
+                            substrate_uptake: float, objective_value: float, status: str,
+                            substrate_uptake_actual: float = 0.0,
+                            atp_consumption: float = 0.0,
+                            solution: Optional[cobra.Solution] = None,
+                            opt_model: Optional[cobra.Model] = None) -> Dict:
+        """Build the results dictionary for a cell-free production solve."""
+        if status == 'optimal':
             results = {
                 'fatty_acid': fatty_acid_name,
                 'substrate': substrate,
                 'substrate_uptake': substrate_uptake,
-                'production_rate': solution.objective_value,
-                'status': solution.status,
+                'production_rate': objective_value,
+                'status': status,
                 'growth_rate': 0.0,  # Cell-free systems don't grow
-                'substrate_uptake_actual': abs(solution.fluxes.get(f'EX_{substrate[0:3]}_e', 0)),
-                'atp_consumption': abs(solution.fluxes.get('ATPM', 0)),
-                'solution': solution,
-                'model': opt_model
+                'substrate_uptake_actual': substrate_uptake_actual,
+                'atp_consumption': atp_consumption
             }
             
+            if solution is not None:
+                results['solution'] = solution
+                results['model'] = opt_model
+            
             # Calculate yield
             if results['substrate_uptake_actual'] > 0:
                 results['yield_mol_per_mol_substrate'] = results['production_rate'] / results['substrate_uptake_actual']
@@ -210,10 +447,10 @@ class CellFreeSimulator:
                 'fatty_acid': fatty_acid_name,
                 'substrate': substrate,
                 'production_rate': 0,
-                'status': solution.status,
-                'error': f"Optimization failed: {solution.status}"
+                'status': status,
+                'error': f"Optimization failed: {status}"
             }
-            print(f"Cell-free optimization failed for {fatty_acid_name}: {solution.status}")
+            print(f"Cell-free optimization failed for {fatty_acid_name}: {status}")
         
         return results
     
@@ -232,18 +469,18 @@ class CellFreeSimulator:
         cellular_optimizer.add_demand_reactions()
         
         # Force some growth in cellular system
-        cellular_model = cellular_optimizer.model.copy()
-        cellular_model.reactions.get_by_id('BIOMASS_Ec_iML1515_core_75p37M').lower_bound = 0.1
-        cellular_model.objective = cellular_optimizer.demand_reactions[fatty_acid_name]
-        cellular_solution = cellular_model.optimize()
-        
-        cellular_results = {
-            'production_rate': cellular_solution.objective_value,
-            'growth_rate': cellular_solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0),
-            'glucose_uptake': abs(cellular_solution.fluxes.get('EX_glc__D_e', 0)),
-            'atp_maintenance': abs(cellular_solution.fluxes.get('ATPM', 0)),
-            'system_type': 'cellular'
-        }
+        with cellular_optimizer.model as cellular_model:
+            cellular_model.reactions.get_by_id(BIOMASS_ID).lower_bound = 0.1
+            cellular_model.objective = cellular_optimizer.demand_reactions[fatty_acid_name]
+            cellular_production = cellular_model.slim_optimize()
+            
+            cellular_results = {
+                'production_rate': cellular_production,
+                'growth_rate': reaction_flux(cellular_model, BIOMASS_ID),
+                'glucose_uptake': abs(reaction_flux(cellular_model, 'EX_glc__D_e')),
+                'atp_maintenance': abs(reaction_flux(cellular_model, 'ATPM')),
+                'system_type': 'cellular'
+            }
         
         # Cell-free optimization (no growth)
         if self.cell_free_model is None:
@@ -293,35 +530,53 @@ class CellFreeSimulator:
             'acetate': 15.0
         }
         
-        results = []
+        if self.cell_free_model is None:
+            self.create_cell_free_model()
         
-        for substrate, uptake_rate in substrates.items():
+        if fatty_acid_name not in self.fatty_acid_map:
+            raise ValueError(f"Fatty acid '{fatty_acid_name}' not supported")
+        
+        # The substrate cases differ only in one exchange bound, so solve each
+        # directly on the LP arrays instead of re-syncing the optlang model.
+        # Rows go straight into a typed record array; the DataFrame is built
+        # once at the end without per-column dtype inference.
+        records = np.zeros(len(substrates), dtype=_SUBSTRATE_RESULT_DTYPE)
+        records['Substrate'] = list(substrates.keys())
+        records['Uptake Rate'] = list(substrates.values())
+        uptakes_actual = np.zeros(len(substrates))
+        
+        for i, (substrate, uptake_rate) in enumerate(substrates.items()):
             try:
-                result = self.optimize_cell_free_production(fatty_acid_name, substrate, uptake_rate)
-                results.append({
-                    'Substrate': substrate,
-                    'Uptake Rate': uptake_rate,
-                    'Production Rate (mmol/gDW/h)': result['production_rate'],
-                    'Yield (mol/mol substrate)': result['yield_mol_per_mol_substrate'],
-                    'Status': result['status']
-                })
+                result = self._solve_production_highs(fatty_acid_name, substrate, uptake_rate)
+                records['Production Rate (mmol/gDW/h)'][i] = result['production_rate']
+                uptakes_actual[i] = result.get('substrate_uptake_actual', 0.0)
+                records['Status'][i] = result['status']
             except Exception as e:
-                results.append({
-                    'Substrate': substrate,
-                    'Uptake Rate': uptake_rate,
-                    'Production Rate (mmol/gDW/h)': 0,
-                    'Yield (mol/mol substrate)': 0,
-                    'Status': f'Error: {e}'
-                })
-        
-        results_df = pd.DataFrame(results)
+                records['Status'][i] = f'Error: {e}'
+        
+        # Yields and productivities for the whole sweep in one vectorized pass
+        yields, productivities = _postprocess(records['Production Rate (mmol/gDW/h)'],
+                                              uptakes_actual, _FATTY_ACID_MW[fatty_acid_name])
+        records['Yield (mol/mol substrate)'] = yields
+        records['Productivity (g/L/h)'] = productivities
+        
+        results_df = pd.DataFrame(records)
         print("\nSUBSTRATE PREFERENCE RESULTS:")
         print(results_df.to_string(index=False))
         
         return results_df
     
-    def visualize_comparison(self, comparison_results: Dict):
-        """Create visualization comparing cellular vs cell-free production."""
+    def visualize_comparison(self, comparison_results: Dict, interactive: bool = True):
+        """
+        Create visualization comparing cellular vs cell-free production.
+        
+        Args:
+            comparison_results: Result of compare_cellular_vs_cell_free
+            interactive: Show the figure; when False it is saved to
+                comparison_<fatty_acid>.png instead
+        """
+        # Import lazily so simulations never pay for matplotlib backend setup
+        plt = get_pyplot(interactive)
         
         # Extract data
         cellular_prod = comparison_results['cellular']['production_rate']
@@ -362,7 +617,7 @@ class CellFreeSimulator:
                     f'{rate:.3f}', ha='center', va='bottom', fontsize=12)
         
         plt.tight_layout()
-        plt.show()
+        finish_figure(fig, f"comparison_{comparison_results['fatty_acid']}.png", interactive)
         
         # Print advantages
         print("\nCELL-FREE SYSTEM ADVANTAGES:")
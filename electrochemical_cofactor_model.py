@@ -12,14 +12,24 @@ Scientific basis:
 - Integration with metabolic pathways
 """
 
+import math
+import os
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.optimize import minimize_scalar
-from typing import Dict, List, Optional, Tuple
-import cobra
-from fba_optimizer import WorkingFBAOptimizer
+from typing import Dict, Optional
 from cell_free_simulator import CellFreeSimulator
+from fba_optimizer import finish_figure, get_pyplot
+
+# Carbon chain lengths for the cofactor stoichiometry estimates (default 8)
+_FA_CARBON = {
+    'butanoic_acid': 4,
+    'hexanoic_acid': 6,
+    'octanoic_acid': 8,
+    'decanoic_acid': 10,
+    'dodecanoic_acid': 12,
+    'tetradecanoic_acid': 14,
+    'hexadecanoic_acid': 16
+}
 
 class ElectrochemicalCofactorModel:
     """
@@ -68,8 +78,47 @@ class ElectrochemicalCofactorModel:
             'alpha': 0.5,  # transfer coefficient
         }
         
+        # Baseline cell-free FBA results by fatty acid; the LP does not depend
+        # on any electrochemical parameter, so it is solved once per fatty acid
+        self._cell_free_sim = None
+        self._baseline_cache: Dict[str, Dict] = {}
+        
+        # Latest optimize_applied_potential results by fatty acid, reused by
+        # visualize_enhancement_potential instead of re-running the sweep
+        self._enhanced_sweep_cache: Dict[str, Dict] = {}
+        
         print("Electrochemical cofactor model initialized")
         
+    # Combined thermodynamic coefficients, derived from the current temperature
+    # and transfer coefficient so that changing either takes effect
+    @property
+    def _f_over_rt(self) -> float:
+        """F/RT (1/V)."""
+        return self.faraday_constant / (self.gas_constant * self.temperature)
+    
+    @property
+    def _rt_over_2f(self) -> float:
+        """RT/2F (V), the Nernst slope for a two-electron couple."""
+        return self.gas_constant * self.temperature / (2 * self.faraday_constant)
+    
+    @property
+    def _alpha_f_over_rt(self) -> float:
+        """alpha F/RT (1/V), the Tafel exponent coefficient."""
+        return self.electrochemical_params['alpha'] * self._f_over_rt
+    
+    def _get_baseline(self, fatty_acid: str) -> Dict:
+        """Baseline cell-free production result for a fatty acid (cached)."""
+        if fatty_acid not in self._baseline_cache:
+            self._baseline_cache[fatty_acid] = self._compute_baseline(fatty_acid)
+        return self._baseline_cache[fatty_acid]
+    
+    def _compute_baseline(self, fatty_acid: str) -> Dict:
+        """Solve the baseline cell-free system for a fatty acid."""
+        if self._cell_free_sim is None:
+            self._cell_free_sim = CellFreeSimulator()
+            self._cell_free_sim.create_cell_free_model()
+        return self._cell_free_sim.optimize_cell_free_production(fatty_acid)
+        
     def calculate_nernst_potential(self, cofactor_pair: str, 
                                  oxidized_conc: float, reduced_conc: float) -> float:
         """
@@ -86,13 +135,9 @@ class ElectrochemicalCofactorModel:
         E_standard = self.redox_potentials[cofactor_pair]
         
         # Nernst equation: E = E° - (RT/nF) * ln(C_red/C_ox)
-        # For NAD+/NADH: n = 2 electrons
-        n_electrons = 2
-        
-        if oxidized_conc > 0 and reduced_conc > 0:
-            nernst_potential = E_standard - (self.gas_constant * self.temperature) / \
-                              (n_electrons * self.faraday_constant) * \
-                              np.log(reduced_conc / oxidized_conc)
+        # For NAD+/NADH: n = 2 electrons; equal concentrations give E = E°
+        if oxidized_conc != reduced_conc and oxidized_conc > 0 and reduced_conc > 0:
+            nernst_potential = E_standard - self._rt_over_2f * math.log(reduced_conc / oxidized_conc)
         else:
             nernst_potential = E_standard
             
@@ -114,43 +159,47 @@ class ElectrochemicalCofactorModel:
         Returns:
             reaction_rate: Electrochemical reaction rate (mmol/s)
         """
-        # Calculate overpotential
-        nernst_potential = self.calculate_nernst_potential(cofactor_pair, 
+        # One Butler-Volmer implementation: evaluate the vector kernel on a 0-d array
+        return float(self.calculate_electrochemical_rate_vec(applied_potential, cofactor_pair,
+                                                             oxidized_conc, reduced_conc))
+    
+    def calculate_electrochemical_rate_vec(self, applied_potentials: np.ndarray,
+                                         cofactor_pair: str,
+                                         oxidized_conc: float,
+                                         reduced_conc: float) -> np.ndarray:
+        """
+        Vectorized calculate_electrochemical_rate over an array of potentials.
+        
+        Args:
+            applied_potentials: Applied electrode potentials (V), an array of
+                any shape or a scalar
+            cofactor_pair: Cofactor redox pair
+            oxidized_conc: Concentration of oxidized form (mM)
+            reduced_conc: Concentration of reduced form (mM)
+            
+        Returns:
+            reaction_rates: Electrochemical reaction rates (mmol/s)
+        """
+        nernst_potential = self.calculate_nernst_potential(cofactor_pair,
                                                          oxidized_conc, reduced_conc)
-        overpotential = applied_potential - nernst_potential
+        overpotential = np.asarray(applied_potentials, dtype=float) - nernst_potential
         
-        # Butler-Volmer equation for electrochemical kinetics
         i0 = self.electrochemical_params['exchange_current_density']
         A = self.electrochemical_params['electrode_area']
-        alpha = self.electrochemical_params['alpha']
-        
-        # Current density (A/cm²)
-        if abs(overpotential) > 0.1:  # High overpotential approximation
-            if overpotential > 0:
-                current_density = i0 * np.exp(alpha * self.faraday_constant * overpotential / 
-                                            (self.gas_constant * self.temperature))
-            else:
-                current_density = -i0 * np.exp(-alpha * self.faraday_constant * abs(overpotential) / 
-                                             (self.gas_constant * self.temperature))
-        else:  # Low overpotential (linear regime)
-            current_density = i0 * self.faraday_constant * overpotential / \
-                            (self.gas_constant * self.temperature)
-        
-        # Total current (A)
-        total_current = current_density * A
         
-        # Reaction rate (mmol/s) - 2 electrons per NADH
-        reaction_rate = abs(total_current) * 1000 / (2 * self.faraday_constant)
+        # Evaluate both Butler-Volmer regimes and pick one per element
+        tafel = np.copysign(i0 * np.exp(self._alpha_f_over_rt * overpotential), overpotential)
+        linear = i0 * self._f_over_rt * overpotential
+        current_density = np.where(np.abs(overpotential) > 0.1, tafel, linear)
         
-        # Consider mass transport limitations
-        max_mass_transport_rate = (self.electrochemical_params['mass_transport_coefficient'] * 
-                                  A * oxidized_conc * 1e-6)  # mol/s
-        mass_transport_rate = max_mass_transport_rate * 1000  # mmol/s
+        # Reaction rate (mmol/s) - 2 electrons per NADH
+        reaction_rate = np.abs(current_density) * A * 1000 / (2 * self.faraday_constant)
         
-        # Rate is limited by slower step
-        actual_rate = min(reaction_rate, mass_transport_rate)
+        # Mass transport limit (mmol/s)
+        mass_transport_rate = (self.electrochemical_params['mass_transport_coefficient'] *
+                               A * oxidized_conc * 1e-3)
         
-        return actual_rate
+        return np.minimum(reaction_rate, mass_transport_rate)
     
     def model_enhanced_cell_free_system(self, fatty_acid: str = 'octanoic_acid',
                                       applied_potential: float = -0.5,
@@ -170,18 +219,14 @@ class ElectrochemicalCofactorModel:
         print(f"Applied potential: {applied_potential:.2f} V")
         print(f"Enhancement factor: {enhancement_factor}x")
         
-        # Start with baseline cell-free system
-        baseline_sim = CellFreeSimulator()
-        baseline_sim.create_cell_free_model()
-        baseline_result = baseline_sim.optimize_cell_free_production(fatty_acid)
+        # Start with baseline cell-free system (solved once per fatty acid)
+        baseline_result = self._get_baseline(fatty_acid)
         
         # Calculate cofactor requirements from baseline
         if baseline_result['status'] == 'optimal':
-            solution = baseline_result['solution']
-            
             # Estimate cofactor fluxes (simplified)
             # For fatty acid synthesis: ~2 NADPH per acetyl unit
-            carbon_length = int(fatty_acid.split('_')[0][-1]) if fatty_acid.split('_')[0][-1].isdigit() else 8
+            carbon_length = _FA_CARBON.get(fatty_acid, 8)
             acetyl_units = carbon_length // 2
             
             nadph_requirement = baseline_result['production_rate'] * acetyl_units * 2  # mmol/gDW/h
@@ -248,43 +293,56 @@ class ElectrochemicalCofactorModel:
         
         # Test range of applied potentials
         potentials = np.linspace(-0.8, -0.2, 13)  # V
-        results = []
-        
-        for potential in potentials:
-            try:
-                result = self.model_enhanced_cell_free_system(fatty_acid, potential, 10)
-                if result['status'] == 'enhanced':
-                    results.append({
-                        'Applied Potential (V)': potential,
-                        'Production Rate (mmol/gDW/h)': result['enhanced_production_rate'],
-                        'Enhancement Factor': result['enhancement_factor_actual'],
-                        'Energy Efficiency (%)': result['energy_efficiency'],
-                        'Electrical Power (W)': result['electrical_power']
-                    })
-            except Exception as e:
-                print(f"  Error at {potential:.2f} V: {e}")
-                
-        if results:
-            results_df = pd.DataFrame(results)
-            
-            # Find optimal potential
-            max_production_idx = results_df['Production Rate (mmol/gDW/h)'].idxmax()
-            optimal_result = results_df.loc[max_production_idx]
-            
-            print(f"\nOptimal conditions:")
-            print(f"  Applied potential: {optimal_result['Applied Potential (V)']:.2f} V")
-            print(f"  Production rate: {optimal_result['Production Rate (mmol/gDW/h)']:.4f} mmol/gDW/h")
-            print(f"  Enhancement factor: {optimal_result['Enhancement Factor']:.2f}x")
-            print(f"  Energy efficiency: {optimal_result['Energy Efficiency (%)']:.1f}%")
-            
-            return {
-                'optimal_potential': optimal_result['Applied Potential (V)'],
-                'optimal_production_rate': optimal_result['Production Rate (mmol/gDW/h)'],
-                'optimal_enhancement': optimal_result['Enhancement Factor'],
-                'results_df': results_df
-            }
-        else:
+        enhancement_factor = 10
+        
+        # The FBA baseline does not depend on the potential, so evaluate the
+        # electrochemical model over the whole sweep at once
+        baseline_result = self._get_baseline(fatty_acid)
+        baseline_rate = baseline_result['production_rate']
+        
+        if baseline_result['status'] != 'optimal' or baseline_rate <= 0:
             return {'error': 'No valid results obtained'}
+        
+        carbon_length = _FA_CARBON.get(fatty_acid, 8)
+        acetyl_units = carbon_length // 2
+        
+        nadph_rates = self.calculate_electrochemical_rate_vec(
+            potentials, 'NADP+/NADPH', 0.5, 0.5) * 3600  # mmol/h
+        production_rates = np.minimum(nadph_rates / (acetyl_units * 2),
+                                      baseline_rate * enhancement_factor)
+        electrical_power = np.abs(potentials) * nadph_rates * 2 * \
+                           self.faraday_constant / 3600  # W
+        product_energy = production_rates * carbon_length * 12 * 1000 * 37  # J/h
+        energy_efficiency = np.divide(product_energy, electrical_power,
+                                      out=np.zeros_like(product_energy),
+                                      where=electrical_power > 0) * 100
+        
+        results_df = pd.DataFrame({
+            'Applied Potential (V)': potentials,
+            'Production Rate (mmol/gDW/h)': production_rates,
+            'Enhancement Factor': production_rates / baseline_rate,
+            'Energy Efficiency (%)': energy_efficiency,
+            'Electrical Power (W)': electrical_power
+        })
+            
+        # Find optimal potential
+        optimal_result = results_df.iloc[int(np.argmax(production_rates))]
+        
+        print(f"\nOptimal conditions:")
+        print(f"  Applied potential: {optimal_result['Applied Potential (V)']:.2f} V")
+        print(f"  Production rate: {optimal_result['Production Rate (mmol/gDW/h)']:.4f} mmol/gDW/h")
+        print(f"  Enhancement factor: {optimal_result['Enhancement Factor']:.2f}x")
+        print(f"  Energy efficiency: {optimal_result['Energy Efficiency (%)']:.1f}%")
+        
+        optimization_results = {
+            'optimal_potential': optimal_result['Applied Potential (V)'],
+            'optimal_production_rate': optimal_result['Production Rate (mmol/gDW/h)'],
+            'optimal_enhancement': optimal_result['Enhancement Factor'],
+            'results_df': results_df
+        }
+        self._enhanced_sweep_cache[fatty_acid] = optimization_results
+        
+        return optimization_results
     
     def compare_regeneration_systems(self, fatty_acid: str = 'octanoic_acid') -> pd.DataFrame:
         """
@@ -296,9 +354,7 @@ class ElectrochemicalCofactorModel:
         print(f"Comparing cofactor regeneration systems for {fatty_acid}")
         
         # Get baseline cell-free system
-        baseline_sim = CellFreeSimulator()
-        baseline_sim.create_cell_free_model()
-        baseline_result = baseline_sim.optimize_cell_free_production(fatty_acid)
+        baseline_result = self._get_baseline(fatty_acid)
         
         systems = []
         
@@ -351,7 +407,7 @@ class ElectrochemicalCofactorModel:
         
         print("\nCofactor Regeneration System Comparison:")
         print("=" * 80)
-        for _, row in comparison_df.iterrows():
+        for row in systems:
             print(f"\n{row['System']}:")
             print(f"  Production rate: {row['Production Rate (mmol/gDW/h)']:.4f} mmol/gDW/h")
             print(f"  Enhancement: {row['Enhancement Factor']:.1f}x")
@@ -361,13 +417,30 @@ class ElectrochemicalCofactorModel:
         
         return comparison_df
     
-    def visualize_enhancement_potential(self, fatty_acid: str = 'octanoic_acid'):
-        """Create visualizations of enhancement potential."""
+    def visualize_enhancement_potential(self, fatty_acid: str = 'octanoic_acid',
+                                        interactive: bool = True,
+                                        outdir: Optional[str] = None):
+        """
+        Create visualizations of enhancement potential.
         
+        Args:
+            fatty_acid: Target fatty acid
+            interactive: Show the figures; when False they are saved as
+                <fatty_acid>_sweep.png and <fatty_acid>_systems.png in outdir
+            outdir: Output directory for saved figures (default: current directory)
+        """
         print(f"Creating enhancement potential visualizations for {fatty_acid}")
         
-        # Get optimization results
-        opt_results = self.optimize_applied_potential(fatty_acid)
+        # Import lazily so modelling runs never pay for matplotlib
+        plt = get_pyplot(interactive)
+        
+        def finish(fig, name: str):
+            finish_figure(fig, os.path.join(outdir or '.', f"{fatty_acid}_{name}.png"), interactive)
+        
+        # Reuse the sweep if optimize_applied_potential already ran for this fatty acid
+        opt_results = self._enhanced_sweep_cache.get(fatty_acid)
+        if opt_results is None:
+            opt_results = self.optimize_applied_potential(fatty_acid)
         
         if 'results_df' in opt_results:
             results_df = opt_results['results_df']
@@ -408,7 +481,7 @@ class ElectrochemicalCofactorModel:
             ax4.grid(True, alpha=0.3)
             
             plt.tight_layout()
-            plt.show()
+            finish(fig, 'sweep')
             
             # System comparison
             comparison_df = self.compare_regeneration_systems(fatty_acid)
@@ -448,7 +521,7 @@ class ElectrochemicalCofactorModel:
                         f'{factor:.1f}x', ha='center', va='bottom', fontsize=10)
             
             plt.tight_layout()
-            plt.show()
+            finish(fig, 'systems')
 
 def main():
     """Demonstrate electrochemical cofactor regeneration modeling."""
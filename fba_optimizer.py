@@ -5,27 +5,298 @@ This module provides a functional system for optimizing fatty acid production
 using existing pathways in the E. coli model.
 """
 
-import cobra
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import pickle
+import re
+import sys
+import zlib
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Optional, Tuple
-from cobra.core import Reaction, Metabolite
-from cobra.flux_analysis import flux_variability_analysis
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
 import logging
 
+# cobra and pandas take seconds to import; they are loaded on first use so
+# that importing this module (e.g. for fatty_acid_map) stays cheap
+if TYPE_CHECKING:
+    import cobra
+    import pandas as pd
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default minimal medium with glucose
+_DEFAULT_MEDIUM = {
+    'EX_glc__D_e': 10.0,
+    'EX_o2_e': 20.0,
+    'EX_pi_e': 1000.0,
+    'EX_nh4_e': 1000.0,
+    'EX_so4_e': 1000.0,
+    'EX_mg2_e': 1000.0,
+    'EX_k_e': 1000.0,
+    'EX_fe2_e': 1000.0,
+    'EX_ca2_e': 1000.0,
+    'EX_mn2_e': 1000.0,
+    'EX_zn2_e': 1000.0,
+    'EX_cu2_e': 1000.0,
+    'EX_cobalt2_e': 1000.0,
+    'EX_mobd_e': 1000.0
+}
+
+# Core biomass objective of iML1515
+BIOMASS_ID = 'BIOMASS_Ec_iML1515_core_75p37M'
+
+# LP solver used unless solver= or COBRA_SOLVER asks for another one (e.g.
+# 'gurobi', 'cplex', 'hybrid' for HiGHS). Commercial solvers are not picked
+# automatically: the pip builds of gurobipy and cplex are size-limited
+# community editions that fail on iML1515-sized models.
+_DEFAULT_SOLVER = 'glpk'
+
+# On-disk cache of built models and optimizers (see load_or_build)
+_CACHE_DIR = Path.home() / '.cache' / 'ecoli-code'
+
+# Batches of independent solves shorter than this run serially: process
+# start-up and model pickling cost more than the LPs themselves
+_PARALLEL_MIN = 64
+
+# Reaction id substrings that mark a pathway as in use
+_PATHWAY_KEYWORDS = {
+    'Glycolysis': ['PGI', 'PFK', 'FBA', 'TPI', 'GAPD', 'PGK', 'PGM', 'ENO', 'PYK'],
+    'TCA Cycle': ['CS', 'ACONTa', 'ACONTb', 'ICDHyr', 'AKGDH', 'SUCOAS', 'SUCDi', 'FUM', 'MDH'],
+    'Fatty Acid Synthesis': ['FACOAL', 'ACCOAL', 'FASYN'],
+    'Acetyl-CoA': ['PDH', 'PTA', 'ACK', 'ACCOAL']
+}
+_PATHWAY_PATTERNS = {name: re.compile('|'.join(map(re.escape, keywords)))
+                     for name, keywords in _PATHWAY_KEYWORDS.items()}
+
+def _excel_engine() -> str:
+    """Prefer the streaming xlsxwriter engine when installed, else openpyxl."""
+    return 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
+
+def select_solver(requested: Optional[str] = None) -> str:
+    """
+    Resolve the LP solver name: requested if given, else the COBRA_SOLVER
+    environment variable, else GLPK. Logs the choice when none was requested.
+    """
+    if requested:
+        return requested
+    
+    solver = os.environ.get('COBRA_SOLVER')
+    if solver:
+        logger.info(f"Using LP solver {solver} from COBRA_SOLVER")
+    else:
+        solver = _DEFAULT_SOLVER
+        logger.info(f"Using default LP solver {solver} (set COBRA_SOLVER or pass solver= to change)")
+    return solver
+
+def reaction_flux(model: cobra.Model, rxn_id: str) -> float:
+    """
+    Flux of rxn_id in the model's last solve, or 0 if the model lacks it.
+    
+    Reads the one value from the solver, so callers that need a few fluxes
+    avoid building solution.fluxes for the whole model.
+    """
+    try:
+        return model.reactions.get_by_id(rxn_id).flux
+    except KeyError:
+        return 0.0
+
+def load_or_build(name: str, key: str, build: Callable[[], Any],
+                  sources: Tuple[str, ...] = (), use_cache: bool = True) -> Any:
+    """
+    Load a pickled object from the on-disk cache, or build it and store it there.
+    
+    The cache entry is keyed on key, the Python and cobra versions and the
+    contents of this module and of sources, so entries go stale on their own
+    when the code that builds or defines the object changes. An entry that
+    cannot be loaded for any reason is logged and rebuilt.
+    
+    Args:
+        name: File name prefix of the cache entry
+        key: Configuration the object is built for (model, solver, ...)
+        build: Builds the object on a cache miss
+        sources: Further source files the cached object depends on
+        use_cache: Read and write the cache; False just calls build
+        
+    Returns:
+        The cached or newly built object
+    """
+    if not use_cache:
+        return build()
+    
+    import cobra
+    
+    digest = hashlib.blake2b(f"{sys.version}:{cobra.__version__}:{key}".encode())
+    for source in (__file__, *sources):
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+    cache_path = _CACHE_DIR / f'{name}_{digest.hexdigest()[:16]}.pkl'
+    
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as f:
+                obj = pickle.load(f)
+            logger.info(f"Loaded cached {name} from {cache_path}")
+            return obj
+        except Exception as e:
+            logger.warning(f"Ignoring unusable cache {cache_path}: {e}")
+    
+    obj = build()
+    
+    # Write to a temporary file first so an interrupted run leaves no partial entry
+    tmp_path = cache_path.with_suffix('.tmp')
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning(f"Could not write cache {cache_path}: {e}")
+    return obj
+
+def get_pyplot(interactive: bool):
+    """
+    Import pyplot for a plotting call.
+    
+    When figures are only saved (interactive=False) and no backend has been
+    chosen yet (pyplot not imported, MPLBACKEND unset), Agg is selected so
+    no GUI toolkit is loaded. A backend already in use, e.g. a notebook's
+    inline backend, is never replaced.
+    """
+    import matplotlib
+    if (not interactive and 'matplotlib.pyplot' not in sys.modules
+            and not os.environ.get('MPLBACKEND')):
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def finish_figure(fig, path: str, interactive: bool):
+    """Show the figure, or save it to path when not interactive; then close it."""
+    plt = get_pyplot(interactive)
+    if interactive:
+        plt.show()
+    else:
+        fig.savefig(path, dpi=100)
+        print(f"Saved figure to {path}")
+    plt.close(fig)
+
+def _percent_improvement(rates: np.ndarray, baseline: float) -> np.ndarray:
+    """
+    Percent change of each rate over the baseline (all zero if baseline <= 0).
+    
+    Rounded to 1e-10 % so solver round-off between solves of the same optimum
+    reads as exactly 0 (adding 0.0 also turns -0.0 into 0.0).
+    """
+    if baseline <= 0:
+        return np.zeros_like(rates, dtype=float)
+    return np.round((rates - baseline) / baseline * 100.0, 10) + 0.0
+
+@dataclass
+class FluxResults:
+    """
+    Flux distributions from optimize_all_fatty_acids stored column-wise:
+    one row of flux_matrix per acid, one column per reaction in rxn_index.
+    Rows of infeasible acids are NaN with zero rates.
+    """
+    flux_matrix: np.ndarray
+    acid_names: List[str]
+    rxn_index: pd.Index
+    production_rates: np.ndarray
+    growth_rates: np.ndarray
+    
+    def fluxes(self, fatty_acid_name: str) -> pd.Series:
+        """Flux distribution of one acid as a Series indexed by reaction id."""
+        import pandas as pd
+        
+        row = self.acid_names.index(fatty_acid_name)
+        return pd.Series(self.flux_matrix[row], index=self.rxn_index)
+
+def _knockout_production(model: cobra.Model, ko: str) -> Tuple[str, float, float, str]:
+    """
+    Re-optimize the model's current objective with one reaction knocked out.
+    
+    Returns:
+        (knockout, production_rate, growth_rate, status)
+    """
+    with model:
+        try:
+            model.reactions.get_by_id(ko).knock_out()
+            logger.info(f"Knocked out: {ko}")
+        except KeyError:
+            logger.warning(f"Reaction {ko} not found for knockout")
+        production_rate = model.slim_optimize()
+        status = model.solver.status
+        growth_rate = reaction_flux(model, BIOMASS_ID) if status == 'optimal' else 0.0
+    return ko, production_rate, growth_rate, status
+
+def _init_pool_worker(model: cobra.Model, task: Callable[[cobra.Model, Any], Any]):
+    """Give each worker process its own copy of the model and the task to run on it."""
+    global _pool_model, _pool_task
+    _pool_model, _pool_task = model, task
+
+def _pool_worker(item: Any) -> Any:
+    """Run the pool's task on one item in a worker process."""
+    return _pool_task(_pool_model, item)
+
+def map_on_model(model: cobra.Model, task: Callable[[cobra.Model, Any], Any],
+                 items: Sequence) -> List:
+    """
+    Apply task(model, item) to every item, keeping the order of items.
+    
+    Batches of _PARALLEL_MIN items or more are spread over
+    cobra.Configuration().processes worker processes, each holding its own
+    copy of the model; shorter ones run serially on model itself, where each
+    solve warm-starts from the previous one. task must be a module-level
+    function so that it can be sent to the workers.
+    
+    Args:
+        model: Model with the shared setup (medium, objective) applied
+        task: Solves one item on a model and returns its result
+        items: Independent work items
+        
+    Returns:
+        List of task results, one per item
+    """
+    from cobra import Configuration
+    from cobra.util import ProcessPool
+    
+    processes = 1
+    if len(items) >= _PARALLEL_MIN:
+        processes = min(Configuration().processes, len(items))
+    if processes == 1:
+        return [task(model, item) for item in items]
+    
+    with ProcessPool(processes, initializer=_init_pool_worker,
+                     initargs=(model, task)) as pool:
+        return pool.map(_pool_worker, items, chunksize=len(items) // processes)
+
 class WorkingFBAOptimizer:
     """
     Working FBA optimizer that uses existing fatty acid CoA metabolites.
     """
     
-    def __init__(self, model_name: str = "iML1515"):
-        """Initialize the FBA optimizer with E. coli model."""
+    def __init__(self, model_name: str = "iML1515", solver: Optional[str] = None):
+        """
+        Initialize the FBA optimizer with E. coli model.
+        
+        Args:
+            model_name: Model to load through cobra.io.load_model
+            solver: LP solver name; defaults to COBRA_SOLVER if set, else glpk
+        """
+        import cobra
+        
         self.model = cobra.io.load_model(model_name)
-        self.original_model = self.model.copy()
+        self.solver = select_solver(solver)
+        self.model.solver = self.solver
+        
+        # Compressed pickle of the pristine model for reset_model; much smaller
+        # than keeping a second live copy and cheaper to take than model.copy()
+        self._snapshot = zlib.compress(pickle.dumps(self.model, protocol=pickle.HIGHEST_PROTOCOL), 1)
         
         # Map of common fatty acids to existing CoA metabolites
         self.fatty_acid_map = {
@@ -40,18 +311,32 @@ class WorkingFBAOptimizer:
         # Store demand reactions
         self.demand_reactions = {}
         
-        logger.info(f"Loaded model: {model_name}")
+        # optimize_all_fatty_acids results on the default medium, reused as
+        # the no-knockout baseline by screen_knockouts
+        self._production_cache: Dict[str, Dict] = {}
+        
+        # Flux matrix of the last optimize_all_fatty_acids call
+        self.flux_results: Optional[FluxResults] = None
+        
+        self._index_model()
+        
+        logger.info(f"Loaded model: {model_name} ({self.solver} solver)")
         logger.info(f"Reactions: {len(self.model.reactions)}, Metabolites: {len(self.model.metabolites)}")
         
         # Check existing fatty acid CoA metabolites
         self._check_existing_fatty_acids()
     
+    def _index_model(self):
+        """Build id -> object lookups for the current model's metabolites and reactions."""
+        self._met_by_id = {met.id: met for met in self.model.metabolites}
+        self._rxn_by_id = {rxn.id: rxn for rxn in self.model.reactions}
+    
     def _check_existing_fatty_acids(self):
         """Check which fatty acid CoA metabolites exist in the model."""
         logger.info("Checking existing fatty acid CoA metabolites...")
         for name, met_id in self.fatty_acid_map.items():
             try:
-                met = self.model.metabolites.get_by_id(met_id)
+                met = self._met_by_id[met_id]
                 logger.info(f"  {name}: {met.name} ({met_id})")
             except KeyError:
                 logger.warning(f"  {name}: {met_id} not found in model")
@@ -59,20 +344,27 @@ class WorkingFBAOptimizer:
     def add_demand_reactions(self):
         """Add demand reactions for all fatty acid CoA metabolites."""
         logger.info("Adding demand reactions for fatty acid CoA metabolites...")
+        self._production_cache = {}
+        
+        from cobra.core import Reaction
+        
+        # Collect new reactions and add them in one call (one solver update)
+        new_reactions = []
         
         for name, met_id in self.fatty_acid_map.items():
             try:
-                met = self.model.metabolites.get_by_id(met_id)
+                met = self._met_by_id[met_id]
                 
                 # Create demand reaction
                 demand_id = f"DM_{met_id}"
-                if demand_id not in self.model.reactions:
-                    demand_rxn = Reaction(demand_id)
-                    demand_rxn.name = f"{name} demand"
-                    demand_rxn.lower_bound = 0
-                    demand_rxn.upper_bound = 1000
+                if demand_id not in self._rxn_by_id:
+                    # Bounds go through the constructor: the property setters
+                    # would validate and re-sync each bound separately
+                    demand_rxn = Reaction(demand_id, name=f"{name} demand",
+                                          lower_bound=0, upper_bound=1000)
                     demand_rxn.add_metabolites({met: -1})
-                    self.model.add_reactions([demand_rxn])
+                    new_reactions.append(demand_rxn)
+                    self._rxn_by_id[demand_id] = demand_rxn
                     
                     self.demand_reactions[name] = demand_id
                     logger.info(f"  Added demand for {name}: {demand_id}")
@@ -82,11 +374,15 @@ class WorkingFBAOptimizer:
                     
             except KeyError:
                 logger.warning(f"  Could not add demand for {name}: {met_id} not found")
+        
+        if new_reactions:
+            self.model.add_reactions(new_reactions)
     
     def optimize_fatty_acid_production(self, 
                                      fatty_acid_name: str,
                                      medium: Optional[Dict[str, float]] = None,
-                                     knockouts: Optional[List[str]] = None) -> Dict:
+                                     knockouts: Optional[List[str]] = None,
+                                     full_solution: bool = False) -> Dict:
         """
         Optimize production of a specific fatty acid.
         
@@ -94,6 +390,9 @@ class WorkingFBAOptimizer:
             fatty_acid_name: Name of fatty acid (e.g., 'octanoic_acid')
             medium: Custom medium composition
             knockouts: List of reaction IDs to knock out
+            full_solution: Build the full cobra Solution and return it under
+                'solution'; otherwise only the objective and the few reported
+                fluxes are read from the solver
             
         Returns:
             optimization_results: Dictionary with optimization results
@@ -102,57 +401,62 @@ class WorkingFBAOptimizer:
             raise ValueError(f"Fatty acid '{fatty_acid_name}' not supported. "
                            f"Available: {list(self.fatty_acid_map.keys())}")
         
-        # Create model copy for optimization
-        opt_model = self.model.copy()
-        
-        # Set medium
-        if medium:
-            opt_model.medium = medium
-        else:
-            # Default minimal medium with glucose
-            opt_model.medium = {
-                'EX_glc__D_e': 10.0,
-                'EX_o2_e': 20.0,
-                'EX_pi_e': 1000.0,
-                'EX_nh4_e': 1000.0,
-                'EX_so4_e': 1000.0,
-                'EX_mg2_e': 1000.0,
-                'EX_k_e': 1000.0,
-                'EX_fe2_e': 1000.0,
-                'EX_ca2_e': 1000.0,
-                'EX_mn2_e': 1000.0,
-                'EX_zn2_e': 1000.0,
-                'EX_cu2_e': 1000.0,
-                'EX_cobalt2_e': 1000.0,
-                'EX_mobd_e': 1000.0
-            }
-        
-        # Apply knockouts
-        if knockouts:
-            for ko in knockouts:
-                try:
-                    opt_model.reactions.get_by_id(ko).knock_out()
-                    logger.info(f"Knocked out: {ko}")
-                except KeyError:
-                    logger.warning(f"Reaction {ko} not found for knockout")
+        # Scope medium/knockout/objective changes to this call; cobra reverts
+        # them when the context exits, so the shared model is never copied
+        with self.model as opt_model:
+            # Set medium
+            opt_model.medium = medium or _DEFAULT_MEDIUM
+            
+            # Apply knockouts
+            if knockouts:
+                for ko in knockouts:
+                    try:
+                        opt_model.reactions.get_by_id(ko).knock_out()
+                        logger.info(f"Knocked out: {ko}")
+                    except KeyError:
+                        logger.warning(f"Reaction {ko} not found for knockout")
+            
+            # Set objective to the demand reaction
+            demand_id = self.demand_reactions[fatty_acid_name]
+            opt_model.objective = demand_id
+            
+            # Optimize
+            if not full_solution:
+                production_rate = opt_model.slim_optimize()
+                status = opt_model.solver.status
+                if status != 'optimal':
+                    return self._summarize(fatty_acid_name, status)
+                return self._summarize(fatty_acid_name, status, production_rate,
+                                       reaction_flux(opt_model, BIOMASS_ID),
+                                       abs(reaction_flux(opt_model, 'EX_glc__D_e')),
+                                       abs(reaction_flux(opt_model, 'EX_o2_e')))
+            
+            solution = opt_model.optimize()
         
-        # Set objective to the demand reaction
-        demand_id = self.demand_reactions[fatty_acid_name]
-        opt_model.objective = demand_id
+        if solution.status != 'optimal':
+            return self._summarize(fatty_acid_name, solution.status)
         
-        # Optimize
-        solution = opt_model.optimize()
+        fluxes = solution.fluxes
+        results = self._summarize(fatty_acid_name, solution.status, solution.objective_value,
+                                  fluxes.get(BIOMASS_ID, 0),
+                                  abs(fluxes.get('EX_glc__D_e', 0)),
+                                  abs(fluxes.get('EX_o2_e', 0)))
+        results['solution'] = solution
         
-        if solution.status == 'optimal':
+        return results
+    
+    def _summarize(self, fatty_acid_name: str, status: str,
+                   production_rate: float = 0.0, growth_rate: float = 0.0,
+                   glucose_uptake: float = 0.0, oxygen_uptake: float = 0.0) -> Dict:
+        """Build the results dictionary for one fatty acid optimization."""
+        if status == 'optimal':
             results = {
                 'fatty_acid': fatty_acid_name,
-                'production_rate': solution.objective_value,
-                'status': solution.status,
-                'growth_rate': solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0),
-                'glucose_uptake': abs(solution.fluxes.get('EX_glc__D_e', 0)),
-                'oxygen_uptake': abs(solution.fluxes.get('EX_o2_e', 0)),
-                'solution': solution,
-                'model': opt_model
+                'production_rate': production_rate,
+                'status': status,
+                'growth_rate': growth_rate,
+                'glucose_uptake': glucose_uptake,
+                'oxygen_uptake': oxygen_uptake
             }
             
             # Calculate yield
@@ -168,10 +472,10 @@ class WorkingFBAOptimizer:
             results = {
                 'fatty_acid': fatty_acid_name,
                 'production_rate': 0,
-                'status': solution.status,
-                'error': f"Optimization failed: {solution.status}"
+                'status': status,
+                'error': f"Optimization failed: {status}"
             }
-            logger.error(f"Optimization failed for {fatty_acid_name}: {solution.status}")
+            logger.error(f"Optimization failed for {fatty_acid_name}: {status}")
         
         return results
     
@@ -181,17 +485,78 @@ class WorkingFBAOptimizer:
         Optimize production for all available fatty acids.
         
         Returns:
-            results: Dictionary with results for each fatty acid
+            results: Dictionary with results for each fatty acid; the flux
+                distributions are kept in self.flux_results
         """
+        import pandas as pd
+        
         logger.info("Optimizing production for all fatty acids...")
         
+        # All acids share the same constraints, so keep one LP and only move
+        # the objective between demand reactions; the solver warm-starts from
+        # the previous basis and no cobra Solution is built. Fluxes are read
+        # straight from the solver's primal values into one matrix row per acid.
+        acid_names = list(self.fatty_acid_map.keys())
+        reactions = self.model.reactions
+        forward_ids = [rxn.id for rxn in reactions]
+        reverse_ids = [rxn.reverse_id for rxn in reactions]
+        flux_matrix = np.full((len(acid_names), len(reactions)), np.nan)
+        production_rates = np.zeros(len(acid_names))
+        growth_rates = np.zeros(len(acid_names))
+        
         results = {}
-        for fatty_acid_name in self.fatty_acid_map.keys():
-            result = self.optimize_fatty_acid_production(fatty_acid_name, medium)
-            results[fatty_acid_name] = result
+        with self.model as opt_model:
+            opt_model.medium = medium or _DEFAULT_MEDIUM
+            
+            previous_id = None
+            for row, fatty_acid_name in enumerate(acid_names):
+                demand_id = self.demand_reactions[fatty_acid_name]
+                if previous_id is None:
+                    # Recorded by the context, so the original objective is restored
+                    opt_model.objective = demand_id
+                else:
+                    self._set_linear_objective(demand_id, previous_id)
+                previous_id = demand_id
+                
+                production_rate = opt_model.slim_optimize()
+                status = opt_model.solver.status
+                if status != 'optimal':
+                    results[fatty_acid_name] = self._summarize(fatty_acid_name, status)
+                    continue
+                
+                primal = opt_model.solver.primal_values
+                flux_matrix[row] = [primal[fwd] - primal[rev]
+                                    for fwd, rev in zip(forward_ids, reverse_ids)]
+                production_rates[row] = production_rate
+                growth_rates[row] = reaction_flux(opt_model, BIOMASS_ID)
+                
+                results[fatty_acid_name] = self._summarize(
+                    fatty_acid_name, status, production_rate, growth_rates[row],
+                    abs(reaction_flux(opt_model, 'EX_glc__D_e')),
+                    abs(reaction_flux(opt_model, 'EX_o2_e')))
+        
+        self.flux_results = FluxResults(flux_matrix, acid_names, pd.Index(forward_ids),
+                                        production_rates, growth_rates)
+        if not medium:
+            self._production_cache = dict(results)
             
         return results
     
+    def _set_linear_objective(self, rxn_id: str, previous_id: str):
+        """
+        Move a single-reaction objective from previous_id to rxn_id by editing
+        the solver objective coefficients in place (no objective rebuild).
+        
+        Not recorded in the model context; callers set the first objective
+        through model.objective so the original is restored on exit.
+        """
+        previous = self._rxn_by_id[previous_id]
+        rxn = self._rxn_by_id[rxn_id]
+        self.model.solver.objective.set_linear_coefficients({
+            previous.forward_variable: 0.0, previous.reverse_variable: 0.0,
+            rxn.forward_variable: 1.0, rxn.reverse_variable: -1.0
+        })
+    
     def screen_knockouts(self, 
                         fatty_acid_name: str,
                         knockout_candidates: List[str]) -> pd.DataFrame:
@@ -205,69 +570,95 @@ class WorkingFBAOptimizer:
         Returns:
             results_df: DataFrame with knockout screening results
         """
+        import pandas as pd
+        
         logger.info(f"Screening knockouts for {fatty_acid_name}...")
         
-        results = []
+        # Set up the production LP once; each knockout is applied and reverted
+        # in its own context. Long candidate lists are spread over processes.
+        with self.model as opt_model:
+            opt_model.medium = _DEFAULT_MEDIUM
+            opt_model.objective = self.demand_reactions[fatty_acid_name]
+            
+            # Test baseline (no knockouts); reuse the all-acid sweep if it ran
+            baseline = self._production_cache.get(fatty_acid_name)
+            if baseline is not None:
+                baseline_rate, baseline_growth = baseline['production_rate'], baseline['growth_rate']
+            else:
+                baseline_rate = opt_model.slim_optimize(error_value=0.0)
+                baseline_growth = (reaction_flux(opt_model, BIOMASS_ID)
+                                   if opt_model.solver.status == 'optimal' else 0.0)
+            
+            ko_results = map_on_model(opt_model, _knockout_production, knockout_candidates)
         
-        # Test baseline (no knockouts)
-        baseline = self.optimize_fatty_acid_production(fatty_acid_name)
-        results.append({
-            'knockouts': 'none',
-            'production_rate': baseline['production_rate'],
-            'growth_rate': baseline['growth_rate'],
-            'improvement': 0.0
-        })
+        # Baseline row first, then every feasible knockout
+        feasible = []
+        for row in ko_results:
+            if row[3] == 'optimal':
+                feasible.append(row)
+            else:
+                logger.warning(f"Knockout screening failed for {row[0]}: {row[3]}")
         
-        # Test individual knockouts
-        for ko in knockout_candidates:
-            try:
-                result = self.optimize_fatty_acid_production(fatty_acid_name, knockouts=[ko])
-                improvement = ((result['production_rate'] - baseline['production_rate']) / 
-                              baseline['production_rate'] * 100) if baseline['production_rate'] > 0 else 0
-                
-                results.append({
-                    'knockouts': ko,
-                    'production_rate': result['production_rate'],
-                    'growth_rate': result['growth_rate'],
-                    'improvement': improvement
-                })
-                
-            except Exception as e:
-                logger.warning(f"Knockout screening failed for {ko}: {e}")
+        knockouts = ['none'] + [row[0] for row in feasible]
+        production_rates = np.array([baseline_rate] + [row[1] for row in feasible])
+        growth_rates = np.array([baseline_growth] + [row[2] for row in feasible])
+        
+        results_df = pd.DataFrame({
+            'knockouts': knockouts,
+            'production_rate': production_rates,
+            'growth_rate': growth_rates,
+            'improvement': _percent_improvement(production_rates, baseline_rate)
+        })
         
-        return pd.DataFrame(results).sort_values('improvement', ascending=False)
+        return results_df.sort_values('improvement', ascending=False)
     
     def analyze_pathway_usage(self, fatty_acid_name: str) -> Dict:
         """
         Analyze which pathways are used for fatty acid production.
         
+        Uses parsimonious FBA (Lewis et al. 2010, doi:10.1038/msb.2010.47):
+        among the flux distributions with optimal production it takes the one
+        with least total flux, so the active set is reproducible instead of an
+        arbitrary alternate optimum padded with futile fluxes. Costs one extra LP.
+        
         Args:
             fatty_acid_name: Target fatty acid name
             
         Returns:
             pathway_analysis: Dictionary with pathway flux analysis
         """
-        result = self.optimize_fatty_acid_production(fatty_acid_name)
+        from cobra.exceptions import OptimizationError
+        from cobra.flux_analysis import pfba
+        
+        demand_id = self.demand_reactions[fatty_acid_name]
+        with self.model as opt_model:
+            opt_model.medium = _DEFAULT_MEDIUM
+            opt_model.objective = demand_id
+            try:
+                solution = pfba(opt_model)
+            except OptimizationError:
+                return {'error': 'No optimal solution available'}
         
-        if result['status'] != 'optimal':
+        if solution.status != 'optimal':
             return {'error': 'No optimal solution available'}
         
-        solution = result['solution']
+        # Find active reactions (flux > 0.001) with one vectorized mask
+        fluxes = solution.fluxes.values
+        active_mask = np.abs(fluxes) > 0.001
+        active_ids = solution.fluxes.index.values[active_mask]
         
-        # Find active reactions (flux > 0.001)
         active_reactions = {}
-        for rxn_id, flux in solution.fluxes.items():
-            if abs(flux) > 0.001:
-                rxn = self.model.reactions.get_by_id(rxn_id)
-                active_reactions[rxn_id] = {
-                    'flux': flux,
-                    'name': rxn.name,
-                    'reaction': str(rxn.reaction)
-                }
+        for rxn_id, flux in zip(active_ids, fluxes[active_mask]):
+            rxn = self._rxn_by_id[rxn_id]
+            active_reactions[rxn_id] = {
+                'flux': flux,
+                'name': rxn.name,
+                'reaction': str(rxn.reaction)
+            }
         
         # Find reactions involving the target fatty acid CoA
         target_met_id = self.fatty_acid_map[fatty_acid_name]
-        target_met = self.model.metabolites.get_by_id(target_met_id)
+        target_met = self._met_by_id[target_met_id]
         
         target_reactions = {}
         for rxn in target_met.reactions:
@@ -277,66 +668,64 @@ class WorkingFBAOptimizer:
         return {
             'total_active_reactions': len(active_reactions),
             'target_fatty_acid_reactions': target_reactions,
-            'production_rate': result['production_rate'],
+            'production_rate': solution.fluxes[demand_id],
             'key_pathways': self._identify_key_pathways(active_reactions)
         }
     
     def _identify_key_pathways(self, active_reactions: Dict) -> List[str]:
         """Identify key metabolic pathways being used."""
-        pathways = []
-        
-        pathway_keywords = {
-            'Glycolysis': ['PGI', 'PFK', 'FBA', 'TPI', 'GAPD', 'PGK', 'PGM', 'ENO', 'PYK'],
-            'TCA Cycle': ['CS', 'ACONTa', 'ACONTb', 'ICDHyr', 'AKGDH', 'SUCOAS', 'SUCDi', 'FUM', 'MDH'],
-            'Fatty Acid Synthesis': ['FACOAL', 'ACCOAL', 'FASYN'],
-            'Acetyl-CoA': ['PDH', 'PTA', 'ACK', 'ACCOAL']
-        }
-        
-        for pathway_name, keywords in pathway_keywords.items():
-            if any(any(keyword in rxn_id for keyword in keywords) for rxn_id in active_reactions):
-                pathways.append(pathway_name)
-        
-        return pathways
+        # One regex pass per pathway over all ids (newline-separated, so no
+        # keyword can match across two reaction ids)
+        joined_ids = '\n'.join(active_reactions)
+        return [pathway_name for pathway_name, pattern in _PATHWAY_PATTERNS.items()
+                if pattern.search(joined_ids)]
     
     def export_results(self, results: Dict[str, Dict], filename: str = "fatty_acid_optimization_results.xlsx"):
         """Export optimization results to Excel file."""
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Summary sheet
-            summary_data = []
-            for fatty_acid, result in results.items():
-                if 'production_rate' in result:
-                    summary_data.append({
-                        'Fatty Acid': fatty_acid,
-                        'Production Rate (mmol/gDW/h)': result['production_rate'],
-                        'Growth Rate (h-1)': result.get('growth_rate', 0),
-                        'Glucose Uptake (mmol/gDW/h)': result.get('glucose_uptake', 0),
-                        'Yield (mol/mol glucose)': result.get('yield_mol_per_mol_glucose', 0),
-                        'Status': result['status']
+        import pandas as pd
+        
+        # Assemble every sheet first, then write them in one pass
+        sheets: Dict[str, pd.DataFrame] = {}
+        
+        # Summary sheet
+        summary = [(fatty_acid, result) for fatty_acid, result in results.items()
+                   if 'production_rate' in result]
+        sheets['Summary'] = pd.DataFrame({
+            'Fatty Acid': [fatty_acid for fatty_acid, _ in summary],
+            'Production Rate (mmol/gDW/h)': [result['production_rate'] for _, result in summary],
+            'Growth Rate (h-1)': [result.get('growth_rate', 0) for _, result in summary],
+            'Glucose Uptake (mmol/gDW/h)': [result.get('glucose_uptake', 0) for _, result in summary],
+            'Yield (mol/mol glucose)': [result.get('yield_mol_per_mol_glucose', 0) for _, result in summary],
+            'Status': [result['status'] for _, result in summary]
+        })
+        
+        # Pathway analysis for each fatty acid
+        for fatty_acid in results.keys():
+            try:
+                pathway_data = self.analyze_pathway_usage(fatty_acid)
+                if 'error' not in pathway_data:
+                    sheets[f'{fatty_acid}_pathway'] = pd.DataFrame({
+                        'Metric': ['Production Rate', 'Total Active Reactions', 'Key Pathways'],
+                        'Value': [pathway_data['production_rate'],
+                                  pathway_data['total_active_reactions'],
+                                  ', '.join(pathway_data['key_pathways'])]
                     })
-            
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Pathway analysis for each fatty acid
-            for fatty_acid in results.keys():
-                try:
-                    pathway_data = self.analyze_pathway_usage(fatty_acid)
-                    if 'error' not in pathway_data:
-                        pathway_df = pd.DataFrame([
-                            {'Metric': 'Production Rate', 'Value': pathway_data['production_rate']},
-                            {'Metric': 'Total Active Reactions', 'Value': pathway_data['total_active_reactions']},
-                            {'Metric': 'Key Pathways', 'Value': ', '.join(pathway_data['key_pathways'])}
-                        ])
-                        pathway_df.to_excel(writer, sheet_name=f'{fatty_acid}_pathway', index=False)
-                except Exception as e:
-                    logger.warning(f"Could not analyze pathway for {fatty_acid}: {e}")
+            except Exception as e:
+                logger.warning(f"Could not analyze pathway for {fatty_acid}: {e}")
+        
+        with pd.ExcelWriter(filename, engine=_excel_engine()) as writer:
+            for sheet_name, sheet_df in sheets.items():
+                sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
         
         logger.info(f"Results exported to {filename}")
     
     def reset_model(self):
         """Reset model to original state."""
-        self.model = self.original_model.copy()
+        self.model = pickle.loads(zlib.decompress(self._snapshot))
+        self._index_model()
         self.demand_reactions = {}
+        self._production_cache = {}
+        self.flux_results = None
         logger.info("Model reset to original state")
 
 def main():
@@ -6,78 +6,180 @@ This script analyzes the trade-offs between cellular growth and product formatio
 and demonstrates why growth rates are 0 in production-optimized systems.
 """
 
+import os
 import cobra
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from fba_optimizer import WorkingFBAOptimizer
+from typing import Optional, Tuple
+from fba_optimizer import (WorkingFBAOptimizer, BIOMASS_ID, finish_figure, get_pyplot,
+                           load_or_build, map_on_model, select_solver)
 from cell_free_simulator import CellFreeSimulator
 
-def analyze_growth_production_tradeoff():
+
+# Set ECOLI_CACHE to let main() reuse the prepared optimizer between runs
+_USE_CACHE = bool(os.environ.get('ECOLI_CACHE'))
+
+def _production_at_growth(model: cobra.Model,
+                          growth_rate: float) -> Tuple[float, float, float, float, str]:
+    """
+    Maximize the model's current objective with growth held at or above growth_rate.
+    
+    A point is one bound change and one solve. The bound is set on the
+    solver's forward variable only: biomass is irreversible, so cobra's
+    setter would just re-sync the fixed reverse variable as well. This
+    bypasses the model context, so callers restore the bound themselves
+    (_reset_growth_bound).
+    
+    Returns:
+        (growth_constraint, actual_growth, production_rate, glucose_uptake, status)
+    """
+    biomass_rxn = model.reactions.get_by_id(BIOMASS_ID)
+    biomass_rxn.forward_variable.lb = growth_rate
+    
+    # Only the objective value and two fluxes are read from the solver;
+    # no Solution (and flux Series) is built
+    production_rate = model.slim_optimize()
+    status = model.solver.status
+    if status != 'optimal':
+        return growth_rate, 0.0, 0.0, 0.0, status
+    return (growth_rate, biomass_rxn.flux, production_rate,
+            abs(model.reactions.get_by_id('EX_glc__D_e').flux), status)
+
+def _reset_growth_bound(biomass_rxn: cobra.Reaction):
+    """Put the solver's biomass bound back in line with the reaction's lower bound."""
+    biomass_rxn.forward_variable.lb = max(biomass_rxn.lower_bound, 0)
+
+def _tune_for_resolves(model: cobra.Model):
+    """
+    Configure the solver for many re-solves of one LP with small changes.
+    
+    Presolve is switched off so each solve starts from the previous optimal
+    basis instead of a rebuilt problem. Gurobi and CPLEX also use dual simplex,
+    which keeps that basis usable after a bound change. GLPK only runs its
+    simplex presolve when asked to, so it is already set up this way.
+    """
+    configuration = model.solver.configuration
+    configuration.presolve = False
+    if model.solver.interface.__name__ in ('optlang.gurobi_interface', 'optlang.cplex_interface'):
+        configuration.lp_method = 'dual'
+
+def _build_optimizer(solver: str) -> WorkingFBAOptimizer:
+    """Load the E. coli model and add the fatty acid demand reactions."""
+    optimizer = WorkingFBAOptimizer(solver=solver)
+    optimizer.add_demand_reactions()
+    return optimizer
+
+def _get_optimizer(use_cache: bool = False) -> WorkingFBAOptimizer:
+    """
+    Load the E. coli model, add the fatty acid demand reactions and tune the solver.
+    
+    Args:
+        use_cache: Reuse (and store) the prepared optimizer in the on-disk
+            cache, so later runs skip model loading and demand setup
+    """
+    solver = select_solver()
+    optimizer = load_or_build('optimizer', f"iML1515:{solver}",
+                              lambda: _build_optimizer(solver),
+                              sources=(__file__,), use_cache=use_cache)
+    _tune_for_resolves(optimizer.model)
+    return optimizer
+
+def analyze_growth_production_tradeoff(optimizer: Optional[WorkingFBAOptimizer] = None,
+                                       growth_constraints: Optional[np.ndarray] = None,
+                                       verbose_plots: Optional[bool] = None,
+                                       interactive: bool = True):
     """
     Analyze the trade-off between growth and production.
+    
+    Args:
+        optimizer: Optimizer with demand reactions added; built if not given
+        growth_constraints: Minimum growth rates to test (h⁻¹), solved and
+            reported in ascending order; defaults to nine points from 0 to 0.8.
+            Long sweeps are solved across worker processes (see
+            fba_optimizer.map_on_model).
+        verbose_plots: Annotate the max-growth and max-production points on
+            the Pareto plot; defaults to interactive, since each boxed label
+            costs a text-extent layout pass when saving
+        interactive: Show the figure; when False it is saved to
+            growth_production_tradeoff.png instead
     """
+    if verbose_plots is None:
+        verbose_plots = interactive
+    
     print("=" * 60)
     print("GROWTH vs PRODUCTION TRADE-OFF ANALYSIS")
     print("=" * 60)
     
     # Initialize optimizer
-    optimizer = WorkingFBAOptimizer()
-    optimizer.add_demand_reactions()
-    
-    # Test different growth constraints
-    growth_constraints = np.linspace(0, 0.8, 9)  # 0 to 0.8 h⁻¹
+    if optimizer is None:
+        optimizer = _get_optimizer()
+    
+    # Test different growth constraints, in ascending order: each bound step
+    # moves the optimum along one piece of the piecewise-linear Pareto front,
+    # so every warm-started solve needs only a few pivots from the last basis
+    if growth_constraints is None:
+        growth_constraints = np.linspace(0, 0.8, 9)  # 0 to 0.8 h⁻¹
+    growth_constraints = np.sort(np.asarray(growth_constraints, dtype=float))
     target_fatty_acid = 'octanoic_acid'
-    
-    results = []
+    demand_id = optimizer.demand_reactions[target_fatty_acid]
     
     print(f"Testing growth constraints for {target_fatty_acid}:")
     print("-" * 50)
     
-    for growth_rate in growth_constraints:
-        model = optimizer.model.copy()
-        
-        # Set growth constraint
-        biomass_rxn = model.reactions.get_by_id('BIOMASS_Ec_iML1515_core_75p37M')
-        biomass_rxn.lower_bound = growth_rate
-        
+    # Serially the whole sweep is solved on one LP: only the biomass lower
+    # bound changes between points, so the solver warm-starts from the
+    # previous basis. The context restores the objective afterwards and
+    # _reset_growth_bound the solver's biomass bound.
+    with optimizer.model as model:
         # Optimize for production
-        model.objective = optimizer.demand_reactions[target_fatty_acid]
-        solution = model.optimize()
+        model.objective = demand_id
         
-        if solution.status == 'optimal':
-            actual_growth = solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0)
-            production_rate = solution.objective_value
-            glucose_uptake = abs(solution.fluxes.get('EX_glc__D_e', 0))
-            
-            results.append({
-                'Growth Constraint': growth_rate,
-                'Actual Growth': actual_growth,
-                'Production Rate': production_rate,
-                'Glucose Uptake': glucose_uptake,
-                'Status': solution.status
-            })
-            
+        try:
+            sweep = map_on_model(model, _production_at_growth, growth_constraints)
+        finally:
+            _reset_growth_bound(model.reactions.get_by_id(BIOMASS_ID))
+    
+    # Fill one array per column; plots and summary work on these directly
+    n_points = len(growth_constraints)
+    growth_arr = np.zeros(n_points)
+    production_arr = np.zeros(n_points)
+    glucose_arr = np.zeros(n_points)
+    status_arr = np.empty(n_points, dtype=object)
+    
+    for i, (growth_rate, actual_growth, production_rate, glucose_uptake, status) in enumerate(sweep):
+        growth_arr[i] = actual_growth
+        production_arr[i] = production_rate
+        glucose_arr[i] = glucose_uptake
+        status_arr[i] = status
+        
+        if status == 'optimal':
             print(f"  Growth {growth_rate:.2f} h⁻¹ → Production {production_rate:.4f} mmol/gDW/h")
         else:
-            results.append({
-                'Growth Constraint': growth_rate,
-                'Actual Growth': 0,
-                'Production Rate': 0,
-                'Glucose Uptake': 0,
-                'Status': solution.status
-            })
             print(f"  Growth {growth_rate:.2f} h⁻¹ → INFEASIBLE")
     
-    results_df = pd.DataFrame(results)
+    feasible = status_arr == 'optimal'
+    results_df = pd.DataFrame({
+        'Growth Constraint': growth_constraints,
+        'Actual Growth': growth_arr,
+        'Production Rate': production_arr,
+        'Glucose Uptake': glucose_arr,
+        'Status': status_arr
+    })
+    
+    if not feasible.any():
+        print("No feasible growth constraint; nothing to plot")
+        return results_df
+    
+    # Key points by masked argmax: infeasible entries can never be selected
+    max_growth_idx = np.argmax(np.where(feasible, growth_arr, -np.inf))
+    max_production_idx = np.argmax(np.where(feasible, production_arr, -np.inf))
     
     # Create Pareto front visualization
+    plt = get_pyplot(interactive)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
     # Plot 1: Growth vs Production (Pareto front)
-    feasible_results = results_df[results_df['Status'] == 'optimal']
-    
-    ax1.plot(feasible_results['Actual Growth'], feasible_results['Production Rate'], 
+    ax1.plot(growth_arr[feasible], production_arr[feasible], 
              'o-', color='blue', markersize=8, linewidth=2, label='Pareto Front')
     ax1.set_xlabel('Growth Rate (h⁻¹)')
     ax1.set_ylabel('Production Rate (mmol/gDW/h)')
@@ -86,21 +188,19 @@ def analyze_growth_production_tradeoff():
     ax1.legend()
     
     # Add annotations for key points
-    max_growth_point = feasible_results.loc[feasible_results['Actual Growth'].idxmax()]
-    max_production_point = feasible_results.loc[feasible_results['Production Rate'].idxmax()]
-    
-    ax1.annotate(f'Max Growth\n({max_growth_point["Actual Growth"]:.2f} h⁻¹)', 
-                xy=(max_growth_point['Actual Growth'], max_growth_point['Production Rate']),
-                xytext=(10, 10), textcoords='offset points', fontsize=10,
-                bbox=dict(boxstyle='round,pad=0.3', facecolor='lightblue', alpha=0.7))
-    
-    ax1.annotate(f'Max Production\n({max_production_point["Production Rate"]:.3f} mmol/gDW/h)', 
-                xy=(max_production_point['Actual Growth'], max_production_point['Production Rate']),
-                xytext=(10, -30), textcoords='offset points', fontsize=10,
-                bbox=dict(boxstyle='round,pad=0.3', facecolor='lightgreen', alpha=0.7))
+    if verbose_plots:
+        ax1.annotate(f'Max Growth\n({growth_arr[max_growth_idx]:.2f} h⁻¹)', 
+                    xy=(growth_arr[max_growth_idx], production_arr[max_growth_idx]),
+                    xytext=(10, 10), textcoords='offset points', fontsize=10,
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='lightblue', alpha=0.7))
+        
+        ax1.annotate(f'Max Production\n({production_arr[max_production_idx]:.3f} mmol/gDW/h)', 
+                    xy=(growth_arr[max_production_idx], production_arr[max_production_idx]),
+                    xytext=(10, -30), textcoords='offset points', fontsize=10,
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='lightgreen', alpha=0.7))
     
     # Plot 2: Resource allocation
-    ax2.plot(feasible_results['Actual Growth'], feasible_results['Glucose Uptake'], 
+    ax2.plot(growth_arr[feasible], glucose_arr[feasible], 
              's-', color='red', markersize=8, linewidth=2, label='Glucose Uptake')
     ax2.set_xlabel('Growth Rate (h⁻¹)')
     ax2.set_ylabel('Glucose Uptake (mmol/gDW/h)')
@@ -109,20 +209,20 @@ def analyze_growth_production_tradeoff():
     ax2.legend()
     
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'growth_production_tradeoff.png', interactive)
     
     # Print summary
     print("\n" + "=" * 60)
     print("TRADE-OFF ANALYSIS SUMMARY")
     print("=" * 60)
-    print(f"Maximum growth rate: {max_growth_point['Actual Growth']:.3f} h⁻¹")
-    print(f"  → Production rate: {max_growth_point['Production Rate']:.4f} mmol/gDW/h")
-    print(f"Maximum production rate: {max_production_point['Production Rate']:.4f} mmol/gDW/h")
-    print(f"  → Growth rate: {max_production_point['Actual Growth']:.3f} h⁻¹")
+    print(f"Maximum growth rate: {growth_arr[max_growth_idx]:.3f} h⁻¹")
+    print(f"  → Production rate: {production_arr[max_growth_idx]:.4f} mmol/gDW/h")
+    print(f"Maximum production rate: {production_arr[max_production_idx]:.4f} mmol/gDW/h")
+    print(f"  → Growth rate: {growth_arr[max_production_idx]:.3f} h⁻¹")
     
     # Calculate trade-off ratio
-    production_loss = (max_production_point['Production Rate'] - max_growth_point['Production Rate'])
-    growth_gain = max_growth_point['Actual Growth']
+    production_loss = (production_arr[max_production_idx] - production_arr[max_growth_idx])
+    growth_gain = growth_arr[max_growth_idx]
     
     if growth_gain > 0:
         trade_off_ratio = production_loss / growth_gain
@@ -130,16 +230,19 @@ def analyze_growth_production_tradeoff():
     
     return results_df
 
-def explain_zero_growth_rates():
+def explain_zero_growth_rates(optimizer: Optional[WorkingFBAOptimizer] = None):
     """
     Explain why growth rates are 0 in production optimization.
+    
+    Args:
+        optimizer: Optimizer with demand reactions added; built if not given
     """
     print("\n" + "=" * 60)
     print("WHY GROWTH RATES ARE 0 IN PRODUCTION OPTIMIZATION")
     print("=" * 60)
     
-    optimizer = WorkingFBAOptimizer()
-    optimizer.add_demand_reactions()
+    if optimizer is None:
+        optimizer = _get_optimizer()
     
     print("1. RESOURCE COMPETITION:")
     print("   - Growth requires biomass components (amino acids, nucleotides, lipids)")
@@ -159,41 +262,36 @@ def explain_zero_growth_rates():
     print("   - Cell-free systems naturally have zero growth")
     print()
     
-    # Demonstrate with concrete example
-    model = optimizer.model.copy()
-    
-    # Case 1: Growth objective
-    print("CASE 1: GROWTH OPTIMIZATION")
-    print("-" * 30)
-    model.objective = 'BIOMASS_Ec_iML1515_core_75p37M'
-    solution = model.optimize()
-    
-    print(f"  Growth rate: {solution.objective_value:.4f} h⁻¹")
-    print(f"  Octanoyl-CoA production: {solution.fluxes.get('DM_occoa_c', 0):.4f} mmol/gDW/h")
-    print(f"  Glucose uptake: {abs(solution.fluxes.get('EX_glc__D_e', 0)):.4f} mmol/gDW/h")
-    
-    # Case 2: Production objective
-    print("\nCASE 2: PRODUCTION OPTIMIZATION")
-    print("-" * 30)
-    model.objective = 'DM_occoa_c'
-    solution = model.optimize()
-    
-    print(f"  Growth rate: {solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0):.4f} h⁻¹")
-    print(f"  Octanoyl-CoA production: {solution.objective_value:.4f} mmol/gDW/h")
-    print(f"  Glucose uptake: {abs(solution.fluxes.get('EX_glc__D_e', 0)):.4f} mmol/gDW/h")
-    
-    # Case 3: Balanced objective
-    print("\nCASE 3: BALANCED OPTIMIZATION (0.5 × Growth + 0.5 × Production)")
-    print("-" * 60)
-    model.objective = {
-        'BIOMASS_Ec_iML1515_core_75p37M': 0.5,
-        'DM_occoa_c': 0.5
-    }
-    solution = model.optimize()
-    
-    print(f"  Growth rate: {solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0):.4f} h⁻¹")
-    print(f"  Octanoyl-CoA production: {solution.fluxes.get('DM_occoa_c', 0):.4f} mmol/gDW/h")
-    print(f"  Glucose uptake: {abs(solution.fluxes.get('EX_glc__D_e', 0)):.4f} mmol/gDW/h")
+    # Demonstrate with concrete example. The three cases differ only in the
+    # objective, so they run as one sweep on the shared LP: each objective
+    # change re-solves from the previous optimal basis, and the context on
+    # the shared model reverts the objective on exit.
+    with optimizer.model as model:
+        biomass_rxn = model.reactions.get_by_id(BIOMASS_ID)
+        demand_rxn = model.reactions.get_by_id(optimizer.demand_reactions['octanoic_acid'])
+        glucose_rxn = model.reactions.get_by_id('EX_glc__D_e')
+        
+        cases = [
+            ("CASE 1: GROWTH OPTIMIZATION", 30, {biomass_rxn: 1.0}),
+            ("\nCASE 2: PRODUCTION OPTIMIZATION", 30, {demand_rxn: 1.0}),
+            ("\nCASE 3: BALANCED OPTIMIZATION (0.5 × Growth + 0.5 × Production)", 60,
+             {biomass_rxn: 0.5, demand_rxn: 0.5}),
+        ]
+        
+        for title, rule_width, objective in cases:
+            print(title)
+            print("-" * rule_width)
+            model.objective = objective
+            
+            # Only the two reported fluxes are read; no Solution is built
+            model.slim_optimize()
+            if model.solver.status != 'optimal':
+                print(f"  No optimal solution ({model.solver.status})")
+                continue
+            
+            print(f"  Growth rate: {biomass_rxn.flux:.4f} h⁻¹")
+            print(f"  Octanoyl-CoA production: {demand_rxn.flux:.4f} mmol/gDW/h")
+            print(f"  Glucose uptake: {abs(glucose_rxn.flux):.4f} mmol/gDW/h")
     
     print("\n" + "=" * 60)
     print("CONCLUSION")
@@ -204,75 +302,94 @@ def explain_zero_growth_rates():
     print("✓ Use growth constraints for realistic cellular simulations")
     print("✓ Multi-objective optimization can balance growth and production")
 
-def compare_system_types():
+def compare_system_types(cellular_optimizer: Optional[WorkingFBAOptimizer] = None,
+                         cell_free_sim: Optional[CellFreeSimulator] = None,
+                         interactive: bool = True):
     """
     Compare different system types: cellular, cell-free, and hybrid.
+    
+    Args:
+        cellular_optimizer: Optimizer with demand reactions added; built if not given
+        cell_free_sim: Simulator with its cell-free model created; built if not given
+        interactive: Show the figure; when False it is saved to
+            system_comparison.png instead
     """
     print("\n" + "=" * 60)
     print("SYSTEM TYPE COMPARISON")
     print("=" * 60)
     
     # Initialize systems
-    cellular_optimizer = WorkingFBAOptimizer()
-    cellular_optimizer.add_demand_reactions()
+    if cellular_optimizer is None:
+        cellular_optimizer = _get_optimizer()
     
-    cell_free_sim = CellFreeSimulator()
-    cell_free_sim.create_cell_free_model()
+    if cell_free_sim is None:
+        cell_free_sim = CellFreeSimulator()
+        cell_free_sim.create_cell_free_model()
     
     target_fatty_acid = 'octanoic_acid'
+    demand_id = cellular_optimizer.demand_reactions[target_fatty_acid]
     
     results = []
     
-    # 1. Natural cellular system (growth-optimized)
-    print("1. NATURAL CELLULAR SYSTEM (Growth-optimized)")
-    print("-" * 50)
-    model = cellular_optimizer.model.copy()
-    model.objective = 'BIOMASS_Ec_iML1515_core_75p37M'
-    solution = model.optimize()
-    
-    cellular_growth = {
-        'System': 'Cellular (Growth-optimized)',
-        'Growth Rate': solution.objective_value,
-        'Production Rate': solution.fluxes.get(cellular_optimizer.demand_reactions[target_fatty_acid], 0),
-        'Glucose Uptake': abs(solution.fluxes.get('EX_glc__D_e', 0)),
-        'ATP Maintenance': abs(solution.fluxes.get('ATPM', 0)),
-        'Description': 'Natural E. coli optimized for growth'
-    }
-    results.append(cellular_growth)
-    
-    # 2. Engineered cellular system (production-optimized)
-    print("2. ENGINEERED CELLULAR SYSTEM (Production-optimized)")
-    print("-" * 50)
-    model.objective = cellular_optimizer.demand_reactions[target_fatty_acid]
-    solution = model.optimize()
-    
-    cellular_production = {
-        'System': 'Cellular (Production-optimized)',
-        'Growth Rate': solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0),
-        'Production Rate': solution.objective_value,
-        'Glucose Uptake': abs(solution.fluxes.get('EX_glc__D_e', 0)),
-        'ATP Maintenance': abs(solution.fluxes.get('ATPM', 0)),
-        'Description': 'Engineered E. coli optimized for production'
-    }
-    results.append(cellular_production)
-    
-    # 3. Balanced cellular system
-    print("3. BALANCED CELLULAR SYSTEM")
-    print("-" * 50)
-    # Force moderate growth
-    model.reactions.get_by_id('BIOMASS_Ec_iML1515_core_75p37M').lower_bound = 0.2
-    model.objective = cellular_optimizer.demand_reactions[target_fatty_acid]
-    solution = model.optimize()
-    
-    cellular_balanced = {
-        'System': 'Cellular (Balanced)',
-        'Growth Rate': solution.fluxes.get('BIOMASS_Ec_iML1515_core_75p37M', 0),
-        'Production Rate': solution.objective_value,
-        'Glucose Uptake': abs(solution.fluxes.get('EX_glc__D_e', 0)),
-        'ATP Maintenance': abs(solution.fluxes.get('ATPM', 0)),
-        'Description': 'Cellular system with forced growth constraint'
-    }
-    results.append(cellular_balanced)
+    # The cellular cases share one model context: objective and bound
+    # changes are reverted on exit, so the model is never copied. Only the
+    # reported fluxes are read back, so no Solution is built.
+    with cellular_optimizer.model as model:
+        # Resolve the reported reactions once for all three cases
+        biomass_rxn = model.reactions.get_by_id(BIOMASS_ID)
+        demand_rxn = model.reactions.get_by_id(demand_id)
+        glucose_rxn = model.reactions.get_by_id('EX_glc__D_e')
+        atpm_rxn = model.reactions.get_by_id('ATPM')
+        
+        # 1. Natural cellular system (growth-optimized)
+        print("1. NATURAL CELLULAR SYSTEM (Growth-optimized)")
+        print("-" * 50)
+        model.objective = biomass_rxn
+        objective_value = model.slim_optimize()
+        
+        cellular_growth = {
+            'System': 'Cellular (Growth-optimized)',
+            'Growth Rate': objective_value,
+            'Production Rate': demand_rxn.flux,
+            'Glucose Uptake': abs(glucose_rxn.flux),
+            'ATP Maintenance': abs(atpm_rxn.flux),
+            'Description': 'Natural E. coli optimized for growth'
+        }
+        results.append(cellular_growth)
+        
+        # 2. Engineered cellular system (production-optimized)
+        print("2. ENGINEERED CELLULAR SYSTEM (Production-optimized)")
+        print("-" * 50)
+        model.objective = demand_rxn
+        objective_value = model.slim_optimize()
+        
+        cellular_production = {
+            'System': 'Cellular (Production-optimized)',
+            'Growth Rate': biomass_rxn.flux,
+            'Production Rate': objective_value,
+            'Glucose Uptake': abs(glucose_rxn.flux),
+            'ATP Maintenance': abs(atpm_rxn.flux),
+            'Description': 'Engineered E. coli optimized for production'
+        }
+        results.append(cellular_production)
+        
+        # 3. Balanced cellular system
+        print("3. BALANCED CELLULAR SYSTEM")
+        print("-" * 50)
+        # Force moderate growth
+        biomass_rxn.lower_bound = 0.2
+        model.objective = demand_rxn
+        objective_value = model.slim_optimize()
+        
+        cellular_balanced = {
+            'System': 'Cellular (Balanced)',
+            'Growth Rate': biomass_rxn.flux,
+            'Production Rate': objective_value,
+            'Glucose Uptake': abs(glucose_rxn.flux),
+            'ATP Maintenance': abs(atpm_rxn.flux),
+            'Description': 'Cellular system with forced growth constraint'
+        }
+        results.append(cellular_balanced)
     
     # 4. Cell-free system
     print("4. CELL-FREE SYSTEM")
@@ -294,7 +411,8 @@ def compare_system_types():
     
     print("\nSYSTEM COMPARISON RESULTS:")
     print("=" * 80)
-    for _, row in results_df.iterrows():
+    # Print from the row dicts directly; the DataFrame is for the caller
+    for row in results:
         print(f"\n{row['System']}:")
         print(f"  Growth Rate: {row['Growth Rate']:.4f} h⁻¹")
         print(f"  Production Rate: {row['Production Rate']:.4f} mmol/gDW/h")
@@ -303,6 +421,9 @@ def compare_system_types():
         print(f"  Description: {row['Description']}")
     
     # Create visualization
+    plt = get_pyplot(interactive)
+    from matplotlib.lines import Line2D
+    
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
     systems = results_df['System']
@@ -310,14 +431,18 @@ def compare_system_types():
     production_rates = results_df['Production Rate']
     
     # Plot 1: Growth vs Production scatter
+    # One scatter artist for all systems; the legend uses proxy markers
     colors = ['blue', 'red', 'green', 'purple']
-    for i, (system, growth, production) in enumerate(zip(systems, growth_rates, production_rates)):
-        ax1.scatter(growth, production, s=150, alpha=0.7, color=colors[i], label=system)
+    ax1.scatter(growth_rates.to_numpy(), production_rates.to_numpy(), s=150, alpha=0.7,
+                c=colors[:len(systems)])
+    legend_handles = [Line2D([], [], linestyle='', marker='o', markersize=np.sqrt(150),
+                             alpha=0.7, color=color, label=system)
+                      for system, color in zip(systems, colors)]
     
     ax1.set_xlabel('Growth Rate (h⁻¹)')
     ax1.set_ylabel('Production Rate (mmol/gDW/h)')
     ax1.set_title('Growth vs Production by System Type', fontsize=14, fontweight='bold')
-    ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax1.legend(handles=legend_handles, bbox_to_anchor=(1.05, 1), loc='upper left')
     ax1.grid(True, alpha=0.3)
     
     # Plot 2: Production rates comparison
@@ -336,21 +461,24 @@ def compare_system_types():
                 f'{rate:.3f}', ha='center', va='bottom', fontsize=10)
     
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'system_comparison.png', interactive)
     
     return results_df
 
 def main():
     """Main function to run all analyses."""
     
+    # Load the model once; every analysis restores it on exit
+    optimizer = _get_optimizer(use_cache=_USE_CACHE)
+    
     # 1. Growth vs production trade-off analysis
-    trade_off_results = analyze_growth_production_tradeoff()
+    trade_off_results = analyze_growth_production_tradeoff(optimizer)
     
     # 2. Explain zero growth rates
-    explain_zero_growth_rates()
+    explain_zero_growth_rates(optimizer)
     
     # 3. Compare system types
-    system_comparison = compare_system_types()
+    system_comparison = compare_system_types(optimizer)
     
     # Final summary
     print("\n" + "=" * 60)
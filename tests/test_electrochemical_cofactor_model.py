@@ -0,0 +1,44 @@
+"""Consistency checks for the electrochemical rate kernels."""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electrochemical_cofactor_model import ElectrochemicalCofactorModel
+
+
+class TestElectrochemicalRate(unittest.TestCase):
+    """The scalar and vectorized rates must agree in every regime."""
+    
+    def setUp(self):
+        self.model = ElectrochemicalCofactorModel()
+    
+    def assert_scalar_matches_vector(self, oxidized_conc: float, reduced_conc: float):
+        nernst = self.model.calculate_nernst_potential('NAD+/NADH', oxidized_conc, reduced_conc)
+        # Overpotentials across the linear (|eta| <= 0.1) and both Tafel branches
+        potentials = nernst + np.linspace(-0.6, 0.6, 241)
+        
+        vector = self.model.calculate_electrochemical_rate_vec(
+            potentials, 'NAD+/NADH', oxidized_conc, reduced_conc)
+        scalar = np.array([self.model.calculate_electrochemical_rate(
+            potential, 'NAD+/NADH', oxidized_conc, reduced_conc) for potential in potentials])
+        
+        np.testing.assert_allclose(scalar, vector, rtol=1e-12, atol=0)
+        self.assertEqual(vector[120], 0.0)  # zero overpotential
+    
+    def test_equal_concentrations(self):
+        self.assert_scalar_matches_vector(0.5, 0.5)
+    
+    def test_unequal_concentrations(self):
+        self.assert_scalar_matches_vector(0.2, 1.8)
+    
+    def test_mass_transport_limited(self):
+        self.assert_scalar_matches_vector(1e-4, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()